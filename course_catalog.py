@@ -0,0 +1,130 @@
+"""
+Course Catalog - Normalized facility / layout / tee set storage
+"""
+import re
+
+
+# Fields that belong to the hole layout rather than to a tee set
+LAYOUT_FIELDS = ('par_values', 'hole_handicaps')
+
+DEFAULT_LAYOUT = "Main"
+
+
+def intern_values(values, pool):
+    """
+    Share one immutable copy of equal lists
+    
+    Args:
+        values: List of numbers
+        pool: Dictionary of already interned tuples
+    
+    Returns:
+        Tuple equal to values, shared with every earlier equal list
+    """
+    key = tuple(values)
+    return pool.setdefault(key, key)
+
+
+def facility_name(course_name, tee_name):
+    """
+    Get the facility a course belongs to
+    
+    "Baytree National Golf Links (blue)" with tee "Blue" belongs to
+    "Baytree National Golf Links". Names without a matching tee suffix are
+    their own facility.
+    
+    Args:
+        course_name: Flat course name
+        tee_name: Tee name of the course
+    
+    Returns:
+        Facility name
+    """
+    match = re.match(r'^(.*\S)\s*\(([^()]*)\)$', course_name)
+    if match and match.group(2).strip().lower() == str(tee_name).strip().lower():
+        return match.group(1)
+    return course_name
+
+
+def normalize_courses(courses):
+    """
+    Group flat courses into facilities, layouts and tee sets
+    
+    Tees of one facility with identical par values and hole handicaps share
+    a single layout, so the layout is stored once however many tees use it.
+    
+    Args:
+        courses: Dictionary of course name -> flat course data
+    
+    Returns:
+        Catalog dictionary: {'facilities': {facility: {'layouts': {name:
+        layout}, 'tee_sets': {course name: tee set}}}}
+    """
+    facilities = {}
+    for course_name, course_data in courses.items():
+        facility = facilities.setdefault(
+            facility_name(course_name, course_data.get('tee_name', '')),
+            {'layouts': {}, 'tee_sets': {}}
+        )
+        layout = {field: list(course_data[field]) for field in LAYOUT_FIELDS}
+        for layout_name, existing in facility['layouts'].items():
+            if existing == layout:
+                break
+        else:
+            layouts = facility['layouts']
+            layout_name = DEFAULT_LAYOUT if not layouts else f"Layout {len(layouts) + 1}"
+            layouts[layout_name] = layout
+        
+        tee_set = {'layout': layout_name}
+        tee_set.update({k: v for k, v in course_data.items() if k not in LAYOUT_FIELDS})
+        if 'yardages' in tee_set:
+            tee_set['yardages'] = list(tee_set['yardages'])
+        facility['tee_sets'][course_name] = tee_set
+    return {'facilities': facilities}
+
+
+def flatten_catalog(catalog, pool=None):
+    """
+    Build the flat course view of a catalog
+    
+    Every tee set becomes a course dictionary with the layout fields filled
+    in. Equal number lists are interned, so all tees of a layout share the
+    same par and handicap tuples.
+    
+    Args:
+        catalog: Catalog dictionary from normalize_courses
+        pool: Optional intern pool to share across calls
+    
+    Returns:
+        Dictionary of course name -> course data
+    """
+    if pool is None:
+        pool = {}
+    courses = {}
+    for facility in catalog['facilities'].values():
+        layouts = {name: {field: intern_values(layout[field], pool) for field in LAYOUT_FIELDS}
+                   for name, layout in facility['layouts'].items()}
+        for course_name, tee_set in facility['tee_sets'].items():
+            course_data = {k: v for k, v in tee_set.items() if k != 'layout'}
+            course_data.update(layouts[tee_set['layout']])
+            if 'yardages' in course_data:
+                course_data['yardages'] = intern_values(course_data['yardages'], pool)
+            courses[course_name] = course_data
+    return courses
+
+
+def read_courses(data, pool=None):
+    """
+    Get the flat course view of a loaded course file
+    
+    Args:
+        data: Parsed JSON, either a catalog or the older flat
+            course name -> course data mapping
+        pool: Optional intern pool to share across calls
+    
+    Returns:
+        Dictionary of course name -> course data
+    """
+    if 'facilities' not in data:
+        data = normalize_courses(data)
+    return flatten_catalog(data, pool)
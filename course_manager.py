@@ -1,9 +1,50 @@
 """
 Course Manager - Handles course data persistence
 """
+import hashlib
 import json
 import os
 
+from course_catalog import normalize_courses, read_courses
+from ghost_profiles import ProfileStore, profile_path
+from hole_model import HoleModel
+
+
+# Layout lengths a course may have: a 9-hole course, a standard round, and
+# all three nines of a 27-hole facility
+VALID_HOLE_COUNTS = (9, 18, 27)
+
+
+def course_hash(course_data):
+    """
+    Fingerprint course data by content
+    
+    Args:
+        course_data: Course data dictionary
+        
+    Returns:
+        Hex digest that changes whenever any course field changes
+    """
+    encoded = json.dumps(course_data, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def file_signature(filename):
+    """
+    Identify the current version of a file without reading it
+    
+    Args:
+        filename: Path of the file
+        
+    Returns:
+        Tuple of (mtime_ns, size), or None if the file is missing
+    """
+    try:
+        stat = os.stat(filename)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
 
 class CourseManager:
     """Manages golf course data storage and retrieval"""
@@ -17,33 +58,73 @@ class CourseManager:
         """
         self.filename = filename
         self.courses = self.load_courses()
+        self.hole_models = {}
+        self.profile_store = None
+        self.listeners = []
+        self.saved_signature = None
     
     def load_courses(self):
         """
         Load courses from JSON file
         
+        Both the facility catalog and the older flat format are read. Par
+        values and hole handicaps shared by several tees are loaded once.
+        
         Returns:
             Dictionary of course data
         """
         if os.path.exists(self.filename):
             try:
                 with open(self.filename, 'r') as f:
-                    return json.load(f)
+                    return read_courses(json.load(f))
             except Exception as e:
                 print(f"Error loading courses: {e}")
                 return {}
         return {}
     
     def save_courses(self):
-        """Save courses to JSON file"""
+        """Save courses to JSON file as a facility catalog"""
         try:
             with open(self.filename, 'w') as f:
-                json.dump(self.courses, f, indent=2)
+                json.dump(normalize_courses(self.courses), f, indent=2)
+            self.saved_signature = file_signature(self.filename)
             return True
         except Exception as e:
             print(f"Error saving courses: {e}")
             return False
     
+    def subscribe(self, callback):
+        """
+        Register a callback for course changes
+        
+        The callback is called as callback(course_name, old_data, new_data)
+        whenever a course's data actually changes; old_data is None for a
+        new course and new_data is None for a deleted one.
+        
+        Args:
+            callback: Function to call
+        """
+        self.listeners.append(callback)
+    
+    def unsubscribe(self, callback):
+        """
+        Remove a callback registered with subscribe
+        
+        Args:
+            callback: Function to remove
+        """
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def notify(self, course_name, old_data, new_data):
+        """Tell listeners that a course changed"""
+        self.hole_models.pop(course_name, None)
+        for callback in list(self.listeners):
+            try:
+                callback(course_name, old_data, new_data)
+            except Exception as e:
+                print(f"Error notifying course listener: {e}")
+    
     def add_course(self, course_name, course_data):
         """
         Add or update a course
@@ -52,8 +133,12 @@ class CourseManager:
             course_name: Name of the course
             course_data: Dictionary containing course information
         """
+        old_data = self.courses.get(course_name)
         self.courses[course_name] = course_data
-        return self.save_courses()
+        saved = self.save_courses()
+        if old_data is None or course_hash(old_data) != course_hash(course_data):
+            self.notify(course_name, old_data, course_data)
+        return saved
     
     def delete_course(self, course_name):
         """
@@ -63,10 +148,41 @@ class CourseManager:
             course_name: Name of the course to delete
         """
         if course_name in self.courses:
-            del self.courses[course_name]
-            return self.save_courses()
+            old_data = self.courses.pop(course_name)
+            saved = self.save_courses()
+            self.notify(course_name, old_data, None)
+            return saved
         return False
     
+    def apply_courses(self, courses):
+        """
+        Replace the courses with freshly loaded data
+        
+        Only courses whose content differs are replaced, and listeners are
+        notified for those alone, so reloading an unchanged file (such as
+        one this manager just saved) does nothing.
+        
+        Args:
+            courses: Dictionary of course data, as stored in the course file
+        
+        Returns:
+            List of names of the courses that changed
+        """
+        changed = []
+        for course_name in list(self.courses) + [n for n in courses if n not in self.courses]:
+            old_data = self.courses.get(course_name)
+            new_data = courses.get(course_name)
+            if old_data is not None and new_data is not None and \
+                    course_hash(old_data) == course_hash(new_data):
+                continue
+            if new_data is None:
+                del self.courses[course_name]
+            else:
+                self.courses[course_name] = new_data
+            self.notify(course_name, old_data, new_data)
+            changed.append(course_name)
+        return changed
+    
     def get_course(self, course_name):
         """
         Get course data
@@ -79,6 +195,46 @@ class CourseManager:
         """
         return self.courses.get(course_name)
     
+    def get_catalog(self):
+        """
+        Get the courses grouped by facility
+        
+        Returns:
+            Catalog dictionary of facilities, their layouts and tee sets
+        """
+        return normalize_courses(self.courses)
+    
+    def get_hole_model(self, course_name):
+        """
+        Get the per-hole scoring model of a course
+        
+        The model is computed on first use and cached until the course is
+        changed or deleted.
+        
+        Args:
+            course_name: Name of the course
+            
+        Returns:
+            HoleModel instance or None
+        """
+        if course_name not in self.hole_models:
+            course_data = self.get_course(course_name)
+            if not course_data:
+                return None
+            self.hole_models[course_name] = HoleModel.from_course(course_data)
+        return self.hole_models[course_name]
+    
+    def get_profile_store(self):
+        """
+        Get the ghost profile store kept next to the course file
+        
+        Returns:
+            ProfileStore instance, opened on first use
+        """
+        if self.profile_store is None:
+            self.profile_store = ProfileStore(profile_path(self.filename))
+        return self.profile_store
+    
     def get_all_courses(self):
         """
         Get all course names
@@ -106,13 +262,22 @@ class CourseManager:
                 return False, f"Missing required field: {field}"
         
         # Validate list lengths
-        if len(course_data['par_values']) != 18:
-            return False, "Must have exactly 18 par values"
+        n_holes = len(course_data['par_values'])
+        if n_holes not in VALID_HOLE_COUNTS:
+            return False, "Must have 9, 18 or 27 par values"
+        
+        if len(course_data['hole_handicaps']) != n_holes:
+            return False, f"Must have exactly {n_holes} hole handicaps"
+        
+        if len(course_data['yardages']) != n_holes:
+            return False, f"Must have exactly {n_holes} yardages"
         
-        if len(course_data['hole_handicaps']) != 18:
-            return False, "Must have exactly 18 hole handicaps"
+        # Hole handicaps rank the holes, e.g. 1-9 or odd 1-17 on nine holes
+        handicaps = course_data['hole_handicaps']
+        if len(set(handicaps)) != n_holes:
+            return False, "Hole handicaps must all be different"
         
-        if len(course_data['yardages']) != 18:
-            return False, "Must have exactly 18 yardages"
+        if min(handicaps) < 1 or max(handicaps) > max(n_holes, 18):
+            return False, f"Hole handicaps must be between 1 and {max(n_holes, 18)}"
         
         return True, None
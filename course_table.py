@@ -0,0 +1,216 @@
+"""
+Course Table - Courses packed into one structured array, shareable between processes
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from course_manager import VALID_HOLE_COUNTS
+from hole_model import HoleModel, handicap_ranks
+from score_model import HANDICAP_BRACKETS
+
+
+# Hole arrays are padded to the longest layout a course may have
+MAX_HOLES = max(VALID_HOLE_COUNTS)
+
+NAME_LENGTH = 96
+TEE_LENGTH = 32
+
+# Bytes before the table in a shared block; the first 8 hold the row count
+HEADER_BYTES = 64
+
+# Rank of padded holes, beyond any course handicap
+PADDED_RANK = np.iinfo(np.int16).max
+
+
+def course_dtype(width=MAX_HOLES):
+    """
+    Get the structured dtype of one packed course
+    
+    Args:
+        width: Length of the padded hole arrays
+    
+    Returns:
+        NumPy structured dtype
+    """
+    n_brackets = len(HANDICAP_BRACKETS)
+    return np.dtype([
+        ('name', f'U{NAME_LENGTH}'),
+        ('tee_name', f'U{TEE_LENGTH}'),
+        ('course_rating', np.float64),
+        ('slope_rating', np.float64),
+        ('n_holes', np.int16),
+        ('par_values', np.int16, (width,)),
+        ('hole_handicaps', np.int16, (width,)),
+        ('hole_ranks', np.int16, (width,)),
+        ('yardages', np.int32, (width,)),
+        ('means', np.float64, (n_brackets, width)),
+        ('sigmas', np.float64, (n_brackets, width)),
+        ('round_sigma', np.float64, (n_brackets,))
+    ])
+
+
+def pack_courses(courses, names=None, hole_models=None, width=None):
+    """
+    Pack courses and their hole models into a structured array
+    
+    Hole arrays are zero-padded to a common width; padded holes have par 0
+    and rank last for stroke allocation.
+    
+    Args:
+        courses: List of course data dictionaries
+        names: Optional list of course names
+        hole_models: Optional list of cached HoleModels, one per course
+        width: Padded hole count, defaults to the longest course
+    
+    Returns:
+        Structured array with one row per course
+    """
+    if width is None:
+        width = max(len(c['par_values']) for c in courses)
+    table = np.zeros(len(courses), dtype=course_dtype(width))
+    table['hole_ranks'] = PADDED_RANK
+    
+    for i, course_data in enumerate(courses):
+        model = hole_models[i] if hole_models else None
+        model = model or HoleModel.from_course(course_data)
+        h = len(course_data['par_values'])
+        row = table[i]
+        row['name'] = names[i] if names else ''
+        row['tee_name'] = course_data.get('tee_name', '')
+        row['course_rating'] = course_data['course_rating']
+        row['slope_rating'] = course_data['slope_rating']
+        row['n_holes'] = h
+        row['par_values'][:h] = course_data['par_values']
+        row['hole_handicaps'][:h] = course_data['hole_handicaps']
+        row['hole_ranks'][:h] = handicap_ranks(np.asarray(course_data['hole_handicaps']))
+        if course_data.get('yardages'):
+            row['yardages'][:h] = course_data['yardages']
+        row['means'][:, :h] = model.means
+        row['sigmas'][:, :h] = model.sigmas
+        row['round_sigma'] = model.round_sigma
+    return table
+
+
+def unpack_course(row):
+    """
+    Turn a packed course back into a course data dictionary
+    
+    Args:
+        row: One row of a packed course table
+    
+    Returns:
+        Course data dictionary, as returned by CourseManager.get_course
+    """
+    h = int(row['n_holes'])
+    return {
+        'tee_name': str(row['tee_name']),
+        'course_rating': float(row['course_rating']),
+        'slope_rating': int(row['slope_rating']),
+        'par_values': row['par_values'][:h].tolist(),
+        'hole_handicaps': row['hole_handicaps'][:h].tolist(),
+        'yardages': row['yardages'][:h].tolist()
+    }
+
+
+class SharedCourseTable:
+    """
+    A packed course table in a multiprocessing shared memory block
+    
+    The parent process creates the table once from a CourseManager and
+    passes its name to workers, which attach to the same memory instead of
+    reading and rebuilding the catalog. The table is read-only by
+    convention. Views of the table must be dropped before close().
+    """
+    
+    def __init__(self, shm, owner=False):
+        """
+        Wrap a shared memory block holding a packed table
+        
+        Use SharedCourseTable.create or attach_course_table instead.
+        
+        Args:
+            shm: SharedMemory block
+            owner: Whether this process created the block
+        """
+        self.shm = shm
+        self.owner = owner
+        n_courses = int(np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0])
+        self.table = np.ndarray((n_courses,), dtype=course_dtype(), buffer=shm.buf,
+                                offset=HEADER_BYTES)
+        self.course_ids = {str(name): i for i, name in enumerate(self.table['name'])}
+    
+    @classmethod
+    def create(cls, course_manager):
+        """
+        Pack every course of a CourseManager into a new shared block
+        
+        Args:
+            course_manager: CourseManager to pack
+        
+        Returns:
+            SharedCourseTable owning the block
+        """
+        names = course_manager.get_all_courses()
+        table = pack_courses([course_manager.get_course(n) for n in names], names,
+                             [course_manager.get_hole_model(n) for n in names], MAX_HOLES)
+        shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + max(table.nbytes, 1))
+        np.ndarray((1,), dtype=np.int64, buffer=shm.buf)[0] = len(table)
+        np.ndarray(table.shape, dtype=table.dtype, buffer=shm.buf, offset=HEADER_BYTES)[:] = table
+        return cls(shm, owner=True)
+    
+    @property
+    def name(self):
+        """Name workers attach to"""
+        return self.shm.name
+    
+    def __len__(self):
+        return len(self.table)
+    
+    def get_course(self, course_name):
+        """
+        Get course data
+        
+        Args:
+            course_name: Name of the course
+        
+        Returns:
+            Course data dictionary or None
+        """
+        course_id = self.course_ids.get(course_name)
+        if course_id is None:
+            return None
+        return unpack_course(self.table[course_id])
+    
+    def close(self):
+        """Detach from the block, and free it if this process created it"""
+        self.table = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+_attached = {}
+
+
+def attach_course_table(name):
+    """
+    Attach to a shared course table, once per process
+    
+    Intended as (or called from) a multiprocessing pool initializer.
+    
+    Args:
+        name: SharedCourseTable.name from the parent process
+    
+    Returns:
+        SharedCourseTable backed by the parent's memory
+    """
+    if name not in _attached:
+        _attached[name] = SharedCourseTable(shared_memory.SharedMemory(name=name))
+    return _attached[name]
@@ -0,0 +1,100 @@
+"""
+Course Watcher - Hot reload of the course catalog when its file changes
+"""
+import json
+import threading
+
+from course_catalog import read_courses
+from course_manager import file_signature
+
+
+class CourseWatcher:
+    """
+    Polls the course file on a background thread and reloads changes
+    
+    The file's modification time and size are checked every interval. When
+    they change, the file is parsed on the watcher thread and handed to
+    CourseManager.apply_courses, which updates and notifies only the
+    courses whose content changed. The manager's own saves are recognised
+    by their signature and skipped. A missing or unreadable file is taken
+    to be mid-write: the check is skipped and retried on the next poll.
+    
+    By default changes are applied on the watcher thread. GUIs should pass a
+    dispatch function that hands the apply step to their own thread, e.g.
+    queue.Queue.put drained from a Tk after() loop.
+    """
+    
+    def __init__(self, course_manager, interval=1.0, dispatch=None):
+        """
+        Initialize a watcher
+        
+        Args:
+            course_manager: CourseManager to keep up to date
+            interval: Seconds between file checks
+            dispatch: Optional function called with a zero-argument callable
+                that applies the reload
+        """
+        self.course_manager = course_manager
+        self.interval = interval
+        self.dispatch = dispatch
+        self.signature = file_signature(course_manager.filename)
+        self.stop_event = threading.Event()
+        self.thread = None
+    
+    def check(self):
+        """
+        Check the file once and reload it if it changed
+        
+        Returns:
+            True if a reload was dispatched
+        """
+        signature = file_signature(self.course_manager.filename)
+        if signature == self.signature:
+            return False
+        if signature == self.course_manager.saved_signature:
+            # Written by the manager itself, which already holds this data
+            self.signature = signature
+            return False
+        
+        if signature is None:
+            # Missing while an editor replaces it; never read as "no courses",
+            # which would delete every course. Try again on the next check
+            return False
+        try:
+            with open(self.course_manager.filename, 'r') as f:
+                courses = read_courses(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # Missing or partially written file; try again on the next check
+            return False
+        self.signature = signature
+        
+        def apply():
+            self.course_manager.apply_courses(courses)
+        
+        if self.dispatch:
+            self.dispatch(apply)
+        else:
+            apply()
+        return True
+    
+    def run(self):
+        """Watcher thread loop"""
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Error watching courses: {e}")
+    
+    def start(self):
+        """Start watching on a daemon thread"""
+        if self.thread is None:
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="CourseWatcher", daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        """Stop watching"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval * 2)
+            self.thread = None
@@ -1,10 +1,15 @@
 """
 Generate Tab - UI for generating ghost rounds
 """
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 from ghost_golfer import GhostGolfer
+from result_cache import GenerationCache
+from rng import CounterRNG, new_seed
+from score_distribution import ScoreDistributions
 from ui_components import (
     create_stat_card,
     create_button,
@@ -13,23 +18,35 @@ from ui_components import (
 )
 
 
+# How often the tab checks for a finished distribution simulation
+DISTRIBUTION_POLL_MS = 100
+
+
 class GenerateTab:
     """Tab for generating ghost golf rounds"""
     
-    def __init__(self, parent, theme, course_manager):
+    def __init__(self, parent, theme, course_manager, distributions=None):
         self.parent = parent
         self.theme = theme
         self.course_manager = course_manager
         
+        # Distribution summaries outlive the tab when passed in by the app
+        self.distributions = distributions or ScoreDistributions(GenerationCache(course_manager))
+        self.distribution_results = queue.Queue()
+        self.distribution_request = None
+        self.scorecard_request = None
+        
         self.main_frame = tk.Frame(parent, bg=theme.colors['bg_primary'])
         self.main_frame.pack(fill='both', expand=True)
         
         # Variables
         self.course_var = tk.StringVar()
         self.ghin_var = tk.StringVar(value="15.0")
+        self.round_code_var = tk.StringVar()
         
         # UI elements
         self.scorecard_rows = []
+        self.avg_labels = []
         
         # Create UI
         self.create_ui()
@@ -85,6 +102,9 @@ class GenerateTab:
         generate_btn.config(font=('Arial', 12, 'bold'), pady=15)
         generate_btn.pack(fill='x')
         
+        # Round code of the last round, editable to replay any round
+        self.create_round_code_input(control_card)
+        
         # Right panel - Results
         self.create_results_panel()
     
@@ -149,6 +169,36 @@ class GenerateTab:
         entry.bind('<Enter>', on_enter)
         entry.bind('<Leave>', on_leave)
     
+    def create_round_code_input(self, parent):
+        """Create round code display and replay button"""
+        group = tk.Frame(parent, bg=self.theme.colors['bg_card'])
+        group.pack(fill='x', padx=20, pady=(0, 20))
+        
+        label = tk.Label(
+            group, text="ROUND CODE",
+            font=('Arial', 9, 'bold'),
+            bg=self.theme.colors['bg_card'],
+            fg=self.theme.colors['text_muted']
+        )
+        label.pack(anchor='w', pady=(0, 8))
+        
+        row = tk.Frame(group, bg=self.theme.colors['bg_card'])
+        row.pack(fill='x')
+        
+        entry = tk.Entry(
+            row, textvariable=self.round_code_var,
+            font=('Consolas', 11),
+            bg=self.theme.colors['bg_primary'],
+            fg=self.theme.colors['text_primary'],
+            insertbackground=self.theme.colors['accent_cyan'],
+            relief='flat',
+            borderwidth=0
+        )
+        entry.pack(side='left', fill='x', expand=True, ipady=8, ipadx=8)
+        
+        replay_btn = create_button(row, "↺ REPLAY", self.replay_round, self.theme, 'secondary')
+        replay_btn.pack(side='left', padx=(10, 0))
+    
     def create_results_panel(self):
         """Create the results display panel"""
         right_panel = tk.Frame(self.main_frame, bg=self.theme.colors['bg_primary'])
@@ -162,6 +212,17 @@ class GenerateTab:
         self.stats_container.pack(fill='x', pady=(0, 15))
         self.stats_container.pack_propagate(False)
         
+        # Distribution of scores for the selected course and index
+        distribution_card = create_card_frame(right_panel, self.theme)
+        distribution_card.pack(fill='x', pady=(0, 15))
+        
+        dist_header = create_section_header(distribution_card, "📈 DISTRIBUTION", self.theme)
+        dist_header.pack(pady=(15, 5), padx=20, anchor='w')
+        
+        self.distribution_body = tk.Frame(distribution_card, bg=self.theme.colors['bg_card'])
+        self.distribution_body.pack(fill='x', padx=20, pady=(0, 15))
+        self.show_distribution_message("Select a course to see the score distribution")
+        
         # Scorecard container
         scorecard_card = create_card_frame(right_panel, self.theme)
         scorecard_card.pack(fill='both', expand=True)
@@ -228,16 +289,17 @@ class GenerateTab:
         
         # Define column widths (proportions that add up to 1.0)
         self.column_weights = {
-            'hole': 0.10,    # 10%
-            'yds': 0.12,     # 12%
-            'par': 0.10,     # 10%
-            'hcp': 0.10,     # 10%
-            'str': 0.10,     # 10%
-            'gross': 0.24,   # 24%
-            'net': 0.24      # 24%
+            'hole': 0.09,    # 9%
+            'yds': 0.11,     # 11%
+            'par': 0.09,     # 9%
+            'hcp': 0.09,     # 9%
+            'str': 0.09,     # 9%
+            'avg': 0.13,     # 13%
+            'gross': 0.20,   # 20%
+            'net': 0.20      # 20%
         }
         
-        headers = ['HOLE', 'YDS', 'PAR', 'HCP', 'STR', 'GROSS', 'NET']
+        headers = ['HOLE', 'YDS', 'PAR', 'HCP', 'STR', 'AVG', 'GROSS', 'NET']
         weights = list(self.column_weights.values())
         
         for header_text, weight in zip(headers, weights):
@@ -259,7 +321,7 @@ class GenerateTab:
         course_data = self.course_manager.get_course(course_name)
         
         if course_data:
-            total_yardage = sum(course_data.get('yardages', [0]*18))
+            total_yardage = sum(course_data.get('yardages', []))
             
             # Update info display
             for widget in self.info_display.winfo_children():
@@ -273,6 +335,7 @@ class GenerateTab:
                 ('RATING', str(course_data['course_rating'])),
                 ('SLOPE', str(course_data['slope_rating'])),
                 ('PAR', str(sum(course_data['par_values']))),
+                ('HOLES', str(len(course_data['par_values']))),
                 ('YARDS', str(total_yardage))
             ]
             
@@ -294,9 +357,34 @@ class GenerateTab:
                     bg=self.theme.colors['bg_secondary'],
                     fg=self.theme.colors['accent_cyan']
                 ).pack(side='left')
+            
+            # Distribution for the index entered so far
+            try:
+                ghin = float(self.ghin_var.get())
+            except ValueError:
+                return
+            self.update_distribution(course_data, ghin)
     
     def generate_round(self):
-        """Generate a ghost golf round"""
+        """Generate a ghost golf round from a fresh seed"""
+        self.play_round(seed=new_seed())
+    
+    def replay_round(self):
+        """Regenerate the round whose code is in the round code field"""
+        code = self.round_code_var.get().strip()
+        if not code:
+            messagebox.showerror("Error", "Please enter a round code")
+            return
+        self.play_round(code=code)
+    
+    def play_round(self, seed=None, code=None):
+        """
+        Generate a round and show its scorecard
+        
+        Args:
+            seed: Seed for a new round
+            code: Round code of a round to replay instead
+        """
         try:
             course_name = self.course_var.get()
             if not course_name:
@@ -316,16 +404,36 @@ class GenerateTab:
                 course_data['course_rating'],
                 course_data['slope_rating'],
                 course_data['par_values'],
-                course_data['hole_handicaps']
+                course_data['hole_handicaps'],
+                hole_model=self.course_manager.get_hole_model(course_name),
+                rng=CounterRNG(seed or 0)
             )
             
-            scores = ghost.generate_round()
+            if code is None:
+                scores = ghost.generate_round()
+                code = ghost.round_code()
+            else:
+                try:
+                    matches = ghost.code_matches(code)
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                if not matches and not messagebox.askyesno(
+                        "Round Code",
+                        "This round code was made with a different course, handicap "
+                        "index or score model, so the scores will not match the "
+                        "original round. Replay it anyway?"):
+                    return
+                scores = ghost.replay_round(code, strict=False)
+            self.round_code_var.set(code)
             
             # Calculate totals
             total_par = sum(course_data['par_values'])
             total_gross = sum(s['gross_score'] for s in scores)
             total_net = sum(s['net_score'] for s in scores)
-            total_yardage = sum(course_data.get('yardages', [0]*18))
+            n_holes = len(course_data['par_values'])
+            yardages = course_data.get('yardages', [0] * n_holes)
+            total_yardage = sum(yardages)
             
             # Update stats cards
             for widget in self.stats_container.winfo_children():
@@ -351,16 +459,18 @@ class GenerateTab:
             for row in self.scorecard_rows:
                 row.destroy()
             self.scorecard_rows = []
+            self.avg_labels = []
             
             # Recreate header (only once)
             self.create_table_header()
             
-            # Display scores
-            yardages = course_data.get('yardages', [0]*18)
-            
-            # Track totals
-            front_nine = {'par': 0, 'gross': 0, 'net': 0, 'yards': 0}
-            back_nine = {'par': 0, 'gross': 0, 'net': 0, 'yards': 0}
+            # Display scores, with a subtotal after every nine
+            n_nines = n_holes // 9
+            if n_nines == 2:
+                nine_labels = ['OUT', 'IN']
+            else:
+                nine_labels = [f"9-{k + 1}" for k in range(n_nines)]
+            nine = {'par': 0, 'gross': 0, 'net': 0, 'yards': 0}
             total_strokes = 0
             
             for score in scores:
@@ -376,45 +486,46 @@ class GenerateTab:
                 score_color = self.theme.get_score_color(gross, par)
                 
                 # Track totals
-                if hole_num <= 9:
-                    front_nine['par'] += par
-                    front_nine['gross'] += gross
-                    front_nine['net'] += net
-                    front_nine['yards'] += yardage
-                else:
-                    back_nine['par'] += par
-                    back_nine['gross'] += gross
-                    back_nine['net'] += net
-                    back_nine['yards'] += yardage
-                
+                nine['par'] += par
+                nine['gross'] += gross
+                nine['net'] += net
+                nine['yards'] += yardage
                 total_strokes += strokes
                 
                 # Create row
                 self.create_score_row(hole_num, yardage, par, hcp, strokes,
-                                     gross, net, score_color, False)
+                                     gross, net, score_color, False,
+                                     holes=slice(hole_num - 1, hole_num))
                 
-                # Add subtotal after hole 9
-                if hole_num == 9:
-                    self.create_score_row('OUT', front_nine['yards'],
-                                         front_nine['par'], '', '',
-                                         front_nine['gross'], front_nine['net'],
-                                         self.theme.colors['accent_blue'], True)
-            
-            # Add back 9 and total
-            self.create_score_row('IN', back_nine['yards'], back_nine['par'],
-                                 '', '', back_nine['gross'], back_nine['net'],
-                                 self.theme.colors['accent_blue'], True)
+                # Add subtotal after each nine of a multi-nine round
+                if hole_num % 9 == 0 and n_nines > 1:
+                    self.create_score_row(nine_labels[hole_num // 9 - 1], nine['yards'],
+                                         nine['par'], '', '',
+                                         nine['gross'], nine['net'],
+                                         self.theme.colors['accent_blue'], True,
+                                         holes=slice(hole_num - 9, hole_num))
+                    nine = {'par': 0, 'gross': 0, 'net': 0, 'yards': 0}
             
+            # Add total
             self.create_score_row('TOT', total_yardage, total_par, '',
                                  total_strokes, total_gross, total_net,
-                                 self.theme.colors['accent_green'], True)
+                                 self.theme.colors['accent_green'], True,
+                                 holes=slice(None))
+            
+            self.scorecard_request = (course_name, ghost.handicap_index)
+            self.update_distribution(course_data, ghost.handicap_index)
         
         except ValueError as e:
             messagebox.showerror("Error", f"Invalid GHIN value: {e}")
     
     def create_score_row(self, hole, yardage, par, hcp, strokes, gross, net,
-                        color, is_total):
-        """Create a score row in the table"""
+                        color, is_total, holes=None):
+        """
+        Create a score row in the table
+        
+        The AVG column is filled in by show_distribution with the average
+        gross score over the holes selected by the holes slice.
+        """
         bg_color = self.theme.colors['bg_secondary'] if is_total else self.theme.colors['bg_card']
         row = tk.Frame(self.scrollable_frame, bg=bg_color, height=35)
         row.pack(fill='x', pady=1)
@@ -431,6 +542,7 @@ class GenerateTab:
             str(par) if par else '',
             str(hcp) if hcp else '',
             str(strokes) if strokes else '',
+            '',
             str(gross),
             str(net)
         ]
@@ -440,9 +552,9 @@ class GenerateTab:
         for i, value in enumerate(values):
             # Determine color
             fg_color = self.theme.colors['text_primary']
-            if i >= 5 and not is_total:  # GROSS and NET columns for regular holes
+            if i >= 6 and not is_total:  # GROSS and NET columns for regular holes
                 fg_color = color
-            elif is_total and i >= 5:  # GROSS and NET for totals
+            elif is_total and i >= 6:  # GROSS and NET for totals
                 fg_color = color
             
             label = tk.Label(
@@ -456,6 +568,105 @@ class GenerateTab:
                        rely=0, 
                        relwidth=weights[i], 
                        relheight=1.0)
+            
+            if i == 5 and holes is not None:
+                label.config(fg=self.theme.colors['text_muted'])
+                self.avg_labels.append((label, holes))
+    
+    def update_distribution(self, course_data, handicap_index):
+        """
+        Show the score distribution for a course and handicap index
+        
+        Summaries already computed are shown at once; otherwise the batch
+        is simulated on a background thread and shown when it finishes.
+        """
+        course_name = self.course_var.get()
+        request = (course_name, handicap_index)
+        self.distribution_request = request
+        
+        summary = self.distributions.cached(course_data, handicap_index)
+        if summary:
+            self.show_distribution(summary)
+            return
+        
+        self.show_distribution_message(
+            f"Simulating {self.distributions.n_samples:,} rounds...")
+        hole_model = self.course_manager.get_hole_model(course_name)
+        
+        def simulate():
+            try:
+                summary = self.distributions.summary(course_data, handicap_index, hole_model)
+            except Exception as e:
+                print(f"Error simulating score distribution: {e}")
+                summary = None
+            self.distribution_results.put((request, summary))
+        
+        threading.Thread(target=simulate, daemon=True).start()
+        self.main_frame.after(DISTRIBUTION_POLL_MS, self.poll_distribution)
+    
+    def poll_distribution(self):
+        """Show a finished background simulation, if it is still wanted"""
+        if not self.main_frame.winfo_exists():
+            return
+        try:
+            request, summary = self.distribution_results.get_nowait()
+        except queue.Empty:
+            self.main_frame.after(DISTRIBUTION_POLL_MS, self.poll_distribution)
+            return
+        if request == self.distribution_request:
+            if summary:
+                self.show_distribution(summary)
+            else:
+                self.show_distribution_message("Score distribution unavailable")
+    
+    def show_distribution_message(self, text):
+        """Replace the distribution panel with a message"""
+        for widget in self.distribution_body.winfo_children():
+            widget.destroy()
+        tk.Label(
+            self.distribution_body, text=text,
+            font=('Arial', 9, 'italic'),
+            bg=self.theme.colors['bg_card'],
+            fg=self.theme.colors['text_muted']
+        ).pack(anchor='w')
+    
+    def show_distribution(self, summary):
+        """Fill the distribution panel and the scorecard AVG column"""
+        for widget in self.distribution_body.winfo_children():
+            widget.destroy()
+        
+        gross, net, rates = summary['gross'], summary['net'], summary['rates']
+        items = [
+            ('EXP GROSS', f"{gross['mean']:.1f}"),
+            ('EXP NET', f"{net['mean']:.1f}"),
+            ('GROSS P10/50/90', f"{gross['p10']:.0f} / {gross['p50']:.0f} / {gross['p90']:.0f}"),
+            ('NET P10/50/90', f"{net['p10']:.0f} / {net['p50']:.0f} / {net['p90']:.0f}"),
+            ('BIRDIE+', f"{rates['birdie']:.1%}"),
+            ('PAR', f"{rates['par']:.1%}"),
+            ('BOGEY', f"{rates['bogey']:.1%}"),
+            ('DOUBLE+', f"{rates['double']:.1%}")
+        ]
+        for i, (label, value) in enumerate(items):
+            cell = tk.Frame(self.distribution_body, bg=self.theme.colors['bg_card'])
+            cell.grid(row=i // 4, column=i % 4, sticky='w', padx=(0, 20), pady=2)
+            tk.Label(
+                cell, text=label,
+                font=('Arial', 8, 'bold'),
+                bg=self.theme.colors['bg_card'],
+                fg=self.theme.colors['text_muted']
+            ).pack(anchor='w')
+            tk.Label(
+                cell, text=value,
+                font=('Arial', 11, 'bold'),
+                bg=self.theme.colors['bg_card'],
+                fg=self.theme.colors['accent_cyan']
+            ).pack(anchor='w')
+        
+        # Only the scorecard of the same course and handicap gets averages
+        if self.distribution_request == self.scorecard_request:
+            hole_means = summary['hole_means']
+            for label, holes in self.avg_labels:
+                label.config(text=f"{sum(hole_means[holes]):.1f}")
     
     def refresh_course_list(self):
         """Refresh the course dropdown list"""
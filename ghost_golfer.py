@@ -1,13 +1,24 @@
 """
 Ghost Golfer - Score generation logic
 """
-import random
+import hashlib
+import json
+import math
+
+from hole_model import STANDARD_HOLES, HoleModel, handicap_ranks
+from rng import CounterRNG, ar1_filter, format_round_code, make_rng, parse_round_code
+from score_model import load_score_model
+
+
+# Hex digits of the check appended to round codes
+ROUND_CHECK_DIGITS = 4
 
 
 class GhostGolfer:
     """Generates realistic golf scores for a ghost player based on handicap"""
     
-    def __init__(self, handicap_index, course_rating, slope_rating, par_values, hole_handicaps):
+    def __init__(self, handicap_index, course_rating, slope_rating, par_values, hole_handicaps,
+                 params=None, hole_model=None, rng=None, golfer_id=0, hole_momentum=0.0):
         """
         Initialize a ghost golfer
         
@@ -15,49 +26,177 @@ class GhostGolfer:
             handicap_index: Player's GHIN handicap index
             course_rating: Course rating from the tees
             slope_rating: Course slope rating
-            par_values: List of 18 par values
-            hole_handicaps: List of 18 handicap indexes (1-18)
+            par_values: List of par values, one per hole (9, 18 or 27)
+            hole_handicaps: List of hole handicap indexes
+            params: Optional score model parameters; defaults to the fitted
+                parameters for the handicap index's bracket
+            hole_model: Optional HoleModel adding yardage effects, see
+                CourseManager.get_hole_model
+            rng: Optional RNG backend or seed; defaults to a fresh StreamRNG
+            golfer_id: Golfer id used to key CounterRNG draws
+            hole_momentum: Correlation of the randomness of consecutive
+                holes, 0 for independent holes
         """
         self.handicap_index = handicap_index
         self.course_rating = course_rating
         self.slope_rating = slope_rating
         self.par_values = par_values
         self.hole_handicaps = hole_handicaps
-        self.course_handicap = round((handicap_index * slope_rating) / 113)
+        self.n_holes = len(par_values)
+        # Course handicap is for 18 holes; shorter or longer rounds scale it
+        scale = self.n_holes / STANDARD_HOLES
+        self.course_handicap = round((handicap_index * slope_rating) / 113 * scale)
+        self.hole_ranks = [int(r) for r in handicap_ranks(hole_handicaps)]
+        self.params = params or load_score_model().params_for(handicap_index)
+        self.hole_model = hole_model or HoleModel(par_values, hole_handicaps)
         
-    def generate_round(self):
+        # Expected strokes (before handicap) and spread of every hole
+        means, variances = self.hole_model.hole_parameters(self.params)
+        self.hole_means = [float(m) for m in means]
+        self.hole_sigmas = [math.sqrt(v) for v in variances]
+        
+        self.rng = make_rng(rng)
+        self.golfer_id = golfer_id
+        self.hole_momentum = hole_momentum
+        self.rounds_generated = 0
+        self.last_round_id = None
+    
+    def generate_round(self, round_id=None):
         """
         Generate a realistic round of golf scores
         
+        Args:
+            round_id: Optional round id; with a CounterRNG the same id always
+                gives the same round. Defaults to the number of rounds
+                generated so far.
+        
+        Returns:
+            List of dictionaries containing hole-by-hole scores
+        """
+        if round_id is None:
+            round_id = self.rounds_generated
+        self.rounds_generated += 1
+        self.last_round_id = round_id
+        draws = self.rng.normals(self.golfer_id, round_id, len(self.par_values) + 1)[0]
+        return self.score_round(draws)
+    
+    def round_code(self, round_id=None):
+        """
+        Get the code that replays a round, see replay_round
+        
+        Args:
+            round_id: Round id, defaults to the last round generated
+        
+        Returns:
+            Round code string, or None unless the ghost draws from a CounterRNG
+        """
+        if not isinstance(self.rng, CounterRNG):
+            return None
+        if round_id is None:
+            round_id = self.last_round_id
+        return format_round_code(self.rng.seed, self.golfer_id, round_id, self.replay_check())
+    
+    def replay_check(self):
+        """
+        Short checksum of everything besides the draws that sets the scores
+        
+        Covers the course (rating, slope, pars, hole handicaps and the
+        yardage effects of the hole model), the handicap index, the score
+        model parameters and hole momentum.
+        
+        Returns:
+            Hex string of ROUND_CHECK_DIGITS digits
+        """
+        context = [
+            self.course_rating, self.slope_rating,
+            [int(p) for p in self.par_values], [int(h) for h in self.hole_handicaps],
+            self.hole_means, self.hole_sigmas,
+            self.handicap_index, sorted(self.params.items()), self.hole_momentum
+        ]
+        encoded = json.dumps(context).encode('utf-8')
+        return hashlib.sha1(encoded).hexdigest()[:ROUND_CHECK_DIGITS].upper()
+    
+    def code_matches(self, code):
+        """
+        Check a round code was made with this ghost's course, index and model
+        
+        Args:
+            code: Round code from round_code
+        
+        Returns:
+            False if the code's check differs; True if it matches or the
+            code has no check
+        
+        Raises:
+            ValueError: If the code is malformed
+        """
+        check = parse_round_code(code)[3]
+        return check is None or check == self.replay_check()
+    
+    def replay_round(self, code, strict=True):
+        """
+        Regenerate a round from its round code
+        
+        Only the draws come from the code; the course, handicap index and
+        score model are the ghost's own. The code's check makes sure they
+        match the original round, since otherwise the scores would differ.
+        The ghost's RNG is left untouched.
+        
+        Args:
+            code: Round code from round_code
+            strict: Refuse codes whose check does not match; pass False to
+                replay the draws under the current conditions anyway
+        
+        Returns:
+            List of dictionaries containing hole-by-hole scores
+        
+        Raises:
+            ValueError: If the code is malformed, or with strict, if it was
+                made with a different course, handicap index or score model
+        """
+        if strict and not self.code_matches(code):
+            raise ValueError("Round code was made with a different course, "
+                             "handicap index or score model")
+        seed, golfer_id, round_id, _ = parse_round_code(code)
+        draws = CounterRNG(seed).normals(golfer_id, round_id, len(self.par_values) + 1)[0]
+        return self.score_round(draws)
+    
+    def score_round(self, draws):
+        """
+        Turn one round's standard normal draws into scores
+        
+        Args:
+            draws: Array of n_holes + 1 draws; the first sets the round
+                adjustment and the rest the per-hole randomness
+        
         Returns:
             List of dictionaries containing hole-by-hole scores
         """
         scores = []
-        expected_strokes_over = self.course_handicap
-        strokes_per_hole = expected_strokes_over / 18.0
-        round_adjustment = random.gauss(0, 1.2)
-        
-        for i, (par, hole_hcp) in enumerate(zip(self.par_values, self.hole_handicaps)):
-            # Calculate strokes received based on course handicap
-            strokes_received = 1 if hole_hcp <= self.course_handicap else 0
-            if self.course_handicap > 18:
-                extra_strokes = self.course_handicap - 18
-                if hole_hcp <= extra_strokes:
+        # Course rating is where a scratch player scores, not par
+        expected_strokes_over = self.course_handicap + self.course_rating - sum(self.par_values)
+        strokes_per_hole = expected_strokes_over / self.n_holes
+        round_adjustment = float(draws[0]) * self.params['round_sigma']
+        hole_draws = draws[1:]
+        if self.hole_momentum:
+            hole_draws = ar1_filter(hole_draws, self.hole_momentum)
+        
+        holes = zip(self.par_values, self.hole_ranks, self.hole_means, self.hole_sigmas)
+        for i, (par, hole_rank, hole_mean, hole_sigma) in enumerate(holes):
+            # Calculate strokes received based on course handicap; the
+            # hardest hole has rank 0
+            strokes_received = 1 if hole_rank < self.course_handicap else 0
+            if self.course_handicap > self.n_holes:
+                extra_strokes = self.course_handicap - self.n_holes
+                if hole_rank < extra_strokes:
                     strokes_received = 2
             
-            # Generate score with some randomness
-            base_score = par + strokes_per_hole
-            hole_randomness = random.gauss(0, 1.1)
-            
-            # Adjust difficulty based on hole handicap
-            if hole_hcp <= 6:
-                difficulty_factor = 0.3
-            elif hole_hcp >= 13:
-                difficulty_factor = -0.2
-            else:
-                difficulty_factor = 0
+            # Generate score with some randomness; the hole mean includes
+            # the difficulty of the hole from its handicap and yardage
+            base_score = hole_mean + strokes_per_hole
+            hole_randomness = float(hole_draws[i]) * hole_sigma
             
-            raw_score = base_score + (round_adjustment / 18.0) + hole_randomness + difficulty_factor
+            raw_score = base_score + (round_adjustment / STANDARD_HOLES) + hole_randomness
             raw_score = max(par - 1, min(par + 6, round(raw_score)))
             net_score = raw_score - strokes_received
             
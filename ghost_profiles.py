@@ -0,0 +1,280 @@
+"""
+Ghost Profiles - Named ghost players stored as NumPy columns
+"""
+import os
+
+import numpy as np
+
+
+PROFILE_FILE = "ghost_profiles.npz"
+
+NAME_LENGTH = 64
+
+# Column name -> (dtype, default); one value per profile
+PROFILE_COLUMNS = {
+    'handicap_index': (np.float64, 15.0),
+    'consistency': (np.float64, 1.0),
+    'par3_strength': (np.float64, 0.0),
+    'par5_strength': (np.float64, 0.0),
+    'form': (np.float64, 0.0)
+}
+
+
+def profile_path(course_file):
+    """
+    Path of the profile store kept next to a course file
+    
+    Args:
+        course_file: Path of the course JSON file
+    
+    Returns:
+        Path of the profile store
+    """
+    return os.path.join(os.path.dirname(course_file), PROFILE_FILE)
+
+
+class ProfileStore:
+    """
+    Named ghost players, one row per ghost
+    
+    Parameters are kept as one NumPy array per column rather than one
+    object per ghost, so a roster of any size is looked up with a single
+    fancy index per column and simulated in one BatchGenerator call:
+    
+    - handicap_index: the ghost's index
+    - consistency: multiplier on per-hole randomness (below 1 is steadier)
+    - par3_strength / par5_strength: strokes gained (-) or lost (+) per
+      par 3 / par 5 hole
+    - form: strokes better (-) or worse (+) per round than the index suggests
+    
+    Every profile gets an id when it is added, stored with it and never
+    reused, so deleting a ghost leaves the ids (and so the CounterRNG
+    draws) of all others unchanged. Ids increase with the row, so rows are
+    found by binary search. CourseManager.get_profile_store opens the
+    store kept next to the course file.
+    """
+    
+    def __init__(self, filename=PROFILE_FILE):
+        """
+        Open a profile store
+        
+        Args:
+            filename: .npz file holding the profiles
+        """
+        self.filename = filename
+        self.names = np.zeros(0, dtype=f'U{NAME_LENGTH}')
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.next_id = 0
+        self.columns = {name: np.zeros(0, dtype=dtype)
+                        for name, (dtype, _) in PROFILE_COLUMNS.items()}
+        self.load_profiles()
+    
+    def load_profiles(self):
+        """Load profiles from the store file, if there is one"""
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with np.load(self.filename) as data:
+                names = data['name'].astype(f'U{NAME_LENGTH}')
+                # Stores written before ids were kept used the row as the id
+                ids = data['id'].astype(np.int64) if 'id' in data else np.arange(len(names))
+                next_id = int(data['next_id']) if 'next_id' in data else len(names)
+                columns = {}
+                for name, (dtype, default) in PROFILE_COLUMNS.items():
+                    if name in data:
+                        columns[name] = data[name].astype(dtype)
+                    else:
+                        columns[name] = np.full(len(names), default, dtype=dtype)
+            self.names = names
+            self.ids = ids
+            self.next_id = max(next_id, int(ids.max()) + 1 if len(ids) else 0)
+            self.columns = columns
+        except Exception as e:
+            print(f"Error loading ghost profiles: {e}")
+    
+    def save_profiles(self):
+        """
+        Save profiles to the store file
+        
+        The file is written under a temporary name and renamed into place,
+        so a crash never leaves a partial store.
+        
+        Returns:
+            True if saved successfully
+        """
+        staging = self.filename + '.tmp.npz'
+        try:
+            np.savez(staging, name=self.names, id=self.ids, next_id=self.next_id,
+                     **self.columns)
+            os.replace(staging, self.filename)
+            return True
+        except Exception as e:
+            print(f"Error saving ghost profiles: {e}")
+            return False
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def profile_id(self, name):
+        """
+        Look up a profile id by name
+        
+        Args:
+            name: Ghost name
+        
+        Returns:
+            Integer profile id or None
+        """
+        matches = np.flatnonzero(self.names == name)
+        return int(self.ids[matches[0]]) if len(matches) else None
+    
+    def rows(self, profile_ids):
+        """
+        Find the rows of profiles by id
+        
+        Args:
+            profile_ids: Integer profile id(s)
+        
+        Returns:
+            Integer row(s)
+        
+        Raises:
+            KeyError: If an id is not in the store
+        """
+        profile_ids = np.asarray(profile_ids, dtype=np.int64)
+        missing = np.setdiff1d(profile_ids, self.ids)
+        if len(missing):
+            raise KeyError(f"Unknown profile id: {missing[0]}")
+        return np.searchsorted(self.ids, profile_ids)
+    
+    def profile_ids(self, names):
+        """
+        Look up many profile ids at once
+        
+        Args:
+            names: Sequence of ghost names
+        
+        Returns:
+            Integer array of profile ids
+        
+        Raises:
+            KeyError: If a name is not in the store
+        """
+        lookup = dict(zip(self.names.tolist(), self.ids.tolist()))
+        try:
+            return np.array([lookup[name] for name in names], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"Unknown ghost: {e.args[0]}")
+    
+    def get_profile(self, name):
+        """
+        Get one profile
+        
+        Args:
+            name: Ghost name
+        
+        Returns:
+            Dictionary of parameters or None
+        """
+        profile_id = self.profile_id(name)
+        if profile_id is None:
+            return None
+        row = self.rows(profile_id)
+        return {column: float(values[row]) for column, values in self.columns.items()}
+    
+    def add_profile(self, name, **params):
+        """
+        Add or update a profile
+        
+        Args:
+            name: Ghost name
+            **params: Parameters from PROFILE_COLUMNS; missing ones keep
+                their current value, or the default for a new profile
+        
+        Returns:
+            Profile id
+        """
+        unknown = set(params) - set(PROFILE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown profile parameter: {sorted(unknown)[0]}")
+        if len(name) > NAME_LENGTH:
+            raise ValueError(f"Ghost name longer than {NAME_LENGTH} characters")
+        
+        profile_id = self.profile_id(name)
+        if profile_id is None:
+            profile_id = self.next_id
+            self.next_id += 1
+            self.names = np.append(self.names, name)
+            self.ids = np.append(self.ids, profile_id)
+            for column, (dtype, default) in PROFILE_COLUMNS.items():
+                self.columns[column] = np.append(self.columns[column],
+                                                 np.array(default, dtype=dtype))
+        row = self.rows(profile_id)
+        for column, value in params.items():
+            self.columns[column][row] = value
+        self.save_profiles()
+        return profile_id
+    
+    def add_profiles(self, names, **params):
+        """
+        Append many new profiles at once
+        
+        Args:
+            names: Sequence of new ghost names
+            **params: Parameter arrays (or scalars) broadcast to len(names)
+        
+        Returns:
+            Integer array of the new profile ids
+        """
+        unknown = set(params) - set(PROFILE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown profile parameter: {sorted(unknown)[0]}")
+        names = [str(name) for name in names]
+        if any(len(name) > NAME_LENGTH for name in names):
+            raise ValueError(f"Ghost name longer than {NAME_LENGTH} characters")
+        names = np.asarray(names, dtype=self.names.dtype)
+        if len(np.unique(names)) != len(names) or np.isin(names, self.names).any():
+            raise ValueError("Ghost names must be new and unique")
+        
+        ids = np.arange(self.next_id, self.next_id + len(names), dtype=np.int64)
+        self.next_id += len(names)
+        self.names = np.concatenate([self.names, names])
+        self.ids = np.concatenate([self.ids, ids])
+        for column, (dtype, default) in PROFILE_COLUMNS.items():
+            values = np.broadcast_to(params.get(column, default), (len(names),))
+            self.columns[column] = np.concatenate([self.columns[column],
+                                                   values.astype(dtype)])
+        self.save_profiles()
+        return ids
+    
+    def delete_profile(self, name):
+        """
+        Delete a profile
+        
+        Args:
+            name: Ghost name
+        
+        Returns:
+            True if deleted and saved
+        """
+        profile_id = self.profile_id(name)
+        if profile_id is None:
+            return False
+        keep = self.ids != profile_id
+        self.names = self.names[keep]
+        self.ids = self.ids[keep]
+        self.columns = {column: values[keep] for column, values in self.columns.items()}
+        return self.save_profiles()
+    
+    def roster(self, profile_ids):
+        """
+        Gather the parameters of a roster
+        
+        Args:
+            profile_ids: Integer array of profile ids, repeats allowed
+        
+        Returns:
+            Dictionary of column name -> array of shape (len(profile_ids),)
+        """
+        rows = self.rows(profile_ids)
+        return {column: values[rows] for column, values in self.columns.items()}
@@ -0,0 +1,342 @@
+"""
+Handicap Simulator - WHS handicap index evolution over a season
+"""
+import numpy as np
+
+from batch_generator import BatchGenerator, allocate_strokes
+from hole_model import STANDARD_HOLES
+from scoring import adjusted_gross_scores, score_differentials
+
+
+WINDOW_SIZE = 20
+MAX_HANDICAP_INDEX = 54.0
+SOFT_CAP = 3.0
+HARD_CAP = 5.0
+
+# Number of lowest differentials used and adjustment, by number of scores
+# in the record (index 0-20). Fewer than 3 scores gives no handicap index.
+LOWEST_USED = [0, 0, 0, 1, 1, 1, 2, 2, 2, 3, 3, 3, 4, 4, 4, 5, 5, 6, 6, 7, 8]
+COUNT_ADJUSTMENT = [0.0, 0.0, 0.0, -2.0, -1.0, 0.0, -1.0, 0.0, 0.0, 0.0,
+                    0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+# Short seasons per ability, their length and the correction steps used
+# to calibrate the gap between average and best-8-of-20 differentials
+GAP_SEASONS = 200
+GAP_ROUNDS = 100
+GAP_ITERATIONS = 4
+
+
+class DifferentialWindow:
+    """
+    Most recent 20 score differentials for many golfers at once
+    
+    Keeps both the posting order (a ring buffer) and a sorted copy of each
+    golfer's window. Posting a score removes the outgoing differential from
+    the sorted copy and inserts the new one in a single O(20) merge, so the
+    window is never re-sorted. Empty slots hold +inf, which keeps them at the
+    end of the sorted rows.
+    """
+    
+    def __init__(self, n_golfers, size=WINDOW_SIZE):
+        """
+        Initialize an empty window
+        
+        Args:
+            n_golfers: Number of golfers tracked
+            size: Number of differentials kept per golfer
+        """
+        self.size = size
+        self.ring = np.full((n_golfers, size), np.inf)
+        self.sorted = np.full((n_golfers, size), np.inf)
+        self.head = 0
+        self.count = 0
+        self._columns = np.arange(size)
+    
+    def push(self, differentials):
+        """
+        Add one differential per golfer, dropping the oldest if full
+        
+        Args:
+            differentials: New differentials, shape (n_golfers,)
+        """
+        outgoing = self.ring[:, self.head].copy()
+        self.ring[:, self.head] = differentials
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        
+        # Drop the outgoing value (its first occurrence in each sorted row)
+        columns = self._columns[:-1]
+        removed_at = (self.sorted < outgoing[:, np.newaxis]).sum(axis=1)
+        source = columns + (columns >= removed_at[:, np.newaxis])
+        remaining = np.take_along_axis(self.sorted, source, axis=1)
+        
+        # Insert the new value at its rank among the remaining ones
+        inserted_at = (remaining < differentials[:, np.newaxis]).sum(axis=1)
+        inserted_at = inserted_at[:, np.newaxis]
+        columns = self._columns
+        source = np.minimum(columns - (columns > inserted_at), self.size - 2)
+        merged = np.take_along_axis(remaining, source, axis=1)
+        self.sorted = np.where(columns == inserted_at,
+                               differentials[:, np.newaxis], merged)
+    
+    def adjust(self, reductions):
+        """
+        Subtract a per-golfer amount from every differential in the window
+        
+        Used for exceptional score reductions. Subtracting a constant keeps
+        each sorted row in order.
+        
+        Args:
+            reductions: Amount to subtract, shape (n_golfers,)
+        """
+        reductions = reductions[:, np.newaxis]
+        self.ring -= reductions
+        self.sorted -= reductions
+    
+    def handicap_index(self):
+        """
+        Calculate handicap indexes from the current window
+        
+        Returns:
+            Handicap index per golfer, NaN until 3 scores have been posted
+        """
+        used = LOWEST_USED[self.count]
+        if used == 0:
+            return np.full(self.sorted.shape[0], np.nan)
+        average = self.sorted[:, :used].mean(axis=1)
+        index = np.round(average + COUNT_ADJUSTMENT[self.count], 1)
+        return np.minimum(index, MAX_HANDICAP_INDEX)
+
+
+def apply_caps(index, low_index):
+    """
+    Apply the WHS soft and hard caps
+    
+    Any increase of more than 3.0 over the low handicap index is reduced by
+    50%, and the total increase is limited to 5.0.
+    
+    Args:
+        index: Calculated handicap indexes
+        low_index: Low handicap index per golfer (NaN where not established)
+    
+    Returns:
+        Capped handicap indexes
+    """
+    increase = index - low_index
+    soft = np.where(increase > SOFT_CAP,
+                    low_index + SOFT_CAP + (increase - SOFT_CAP) / 2, index)
+    capped = np.round(np.minimum(soft, low_index + HARD_CAP), 1)
+    return np.where(np.isnan(low_index), index, capped)
+
+
+def exceptional_score_reduction(differentials, handicap_index):
+    """
+    Calculate exceptional score reductions
+    
+    A differential 7.0-9.9 below the handicap index reduces every
+    differential in the record by 1.0; 10.0 or more below reduces by 2.0.
+    
+    Args:
+        differentials: New differentials, shape (n_golfers,)
+        handicap_index: Handicap index when the round was played
+    
+    Returns:
+        Reduction per golfer
+    """
+    margin = handicap_index - differentials
+    reduction = np.where(margin >= 10.0, 2.0, np.where(margin >= 7.0, 1.0, 0.0))
+    return np.where(np.isnan(margin), 0.0, reduction)
+
+
+class SeasonSimulator:
+    """
+    Simulates how ghost handicap indexes drift over a season
+    
+    The score model centres a golfer's rounds on course rating plus course
+    handicap, but an index is the average of the best 8 of the last 20
+    differentials, which sits well below the average differential: with
+    the default parameters a golfer generated at index 5, 10 or 20 settles
+    at about 3.9, 7.6 or 16.6. So each ability is first calibrated: the
+    season adds a gap to every round, found by simulating short seasons,
+    so that the index settles at the ability itself.
+    
+    With round momentum each golfer carries a form value from round to
+    round, an AR(1) series that replaces the independent round adjustment,
+    so hot and cold spells last several rounds.
+    """
+    
+    def __init__(self, courses, hole_momentum=0.0, round_momentum=0.0):
+        """
+        Initialize a season simulator
+        
+        Args:
+            courses: List of course data dictionaries; round r of the season
+                is played on courses[r % len(courses)]
+            hole_momentum: Correlation between consecutive holes of a round
+            round_momentum: Correlation of a golfer's form between
+                consecutive rounds
+        """
+        self.courses = courses
+        self.generators = [BatchGenerator.from_course(c, hole_momentum=hole_momentum)
+                           for c in courses]
+        self.round_momentum = round_momentum
+        self.form = None
+    
+    def ability_gaps(self, ability, seed=0, n_seasons=GAP_SEASONS, n_rounds=GAP_ROUNDS,
+                     iterations=GAP_ITERATIONS):
+        """
+        Calibrate how far above their ability golfers play on average
+        
+        Plays n_seasons short seasons per distinct ability, with the full
+        index rules (caps and exceptional score reductions included), and
+        moves the gap until the average index over each season equals the
+        ability. The draws are fixed across steps, so the fit converges in
+        a few steps.
+        
+        Args:
+            ability: True ability per golfer, as a handicap index
+            seed: Seed of the calibration draws
+            n_seasons: Simulated seasons per distinct ability
+            n_rounds: Rounds per simulated season
+            iterations: Correction steps
+        
+        Returns:
+            Gap per golfer in differential (index) units
+        """
+        ability = np.asarray(ability, dtype=float)
+        distinct, golfers = np.unique(ability, return_inverse=True)
+        levels = np.repeat(distinct, n_seasons)
+        
+        gaps = np.zeros(len(distinct))
+        for _ in range(iterations):
+            rng = np.random.default_rng(seed)
+            history = self.season(levels, np.repeat(gaps, n_seasons), n_rounds, rng)['index']
+            settled = history[1:].mean(axis=0).reshape(len(distinct), n_seasons)
+            gaps += distinct - settled.mean(axis=1)
+        return gaps[golfers.ravel()]
+    
+    def next_form(self, n_golfers, rng):
+        """
+        Advance every golfer's form by one round
+        
+        Args:
+            n_golfers: Number of golfers
+            rng: NumPy random generator
+        
+        Returns:
+            Standard normal form per golfer, or None without round momentum
+        """
+        if not self.round_momentum:
+            return None
+        innovation = rng.standard_normal(n_golfers)
+        if self.form is None or len(self.form) != n_golfers:
+            self.form = innovation
+        else:
+            phi = self.round_momentum
+            self.form = phi * self.form + np.sqrt(1.0 - phi * phi) * innovation
+        return self.form
+    
+    def play(self, ability, handicap_index, round_number, rng, gap=0.0):
+        """
+        Play one round for every golfer and calculate differentials
+        
+        Scores are drawn at each golfer's true ability; the current index
+        only sets the strokes received for the net double bogey cap.
+        
+        Args:
+            ability: True playing ability per golfer, as a handicap index
+            handicap_index: Current index per golfer
+            round_number: Round of the season, selects the course
+            rng: NumPy random generator
+            gap: Differential added to every golfer's expected round, scalar
+                or per golfer, see ability_gaps
+        
+        Returns:
+            Tuple of (gross totals, differentials)
+        """
+        generator = self.generators[round_number % len(self.generators)]
+        form = self.next_form(len(ability), rng)
+        # A differential of d is d * slope / 113 strokes over 18 holes
+        per_hole = np.asarray(gap, dtype=float) * generator.slope_rating / 113 / STANDARD_HOLES
+        offsets = np.broadcast_to(np.reshape(per_hole, (-1, 1)),
+                                  (len(ability), generator.n_holes))
+        batch = generator.generate(ability, len(ability), seed=rng, form=form,
+                                   offsets=offsets)
+        strokes = allocate_strokes(generator.course_handicap(handicap_index),
+                                   generator.hole_handicaps)
+        adjusted = adjusted_gross_scores(batch.gross, batch.par, strokes)
+        differentials = score_differentials(
+            adjusted.sum(axis=1), generator.course_rating, generator.slope_rating
+        )
+        return batch.gross_totals(), differentials
+    
+    def run(self, initial_index, n_rounds, seed=None):
+        """
+        Simulate a season
+        
+        Every golfer's ability stays at its initial index all season: it
+        starts with an established record of 20 rounds, then plays n_rounds
+        scored at that ability, shifted by the calibrated gap so the index
+        settles at the ability. The computed index only sets strokes for
+        the net double bogey cap and feeds the caps and exceptional score
+        reductions, so it tracks ability rather than drifting with itself.
+        The low handicap index is the lowest index of the season so far.
+        
+        Args:
+            initial_index: True ability per golfer as a handicap index,
+                shape (n_golfers,)
+            n_rounds: Rounds played in the season
+            seed: Optional seed for the NumPy random generator
+        
+        Returns:
+            Dictionary of arrays: 'index' (n_rounds + 1, n_golfers),
+            'differentials' and 'gross' (n_rounds, n_golfers)
+        """
+        initial_index = np.asarray(initial_index, dtype=float)
+        gaps = self.ability_gaps(initial_index)
+        return self.season(initial_index, gaps, n_rounds, np.random.default_rng(seed))
+    
+    def season(self, initial_index, gaps, n_rounds, rng):
+        """
+        Simulate a season at given gaps, see run
+        
+        Args:
+            initial_index: True ability per golfer, shape (n_golfers,)
+            gaps: Gap per golfer, see ability_gaps
+            n_rounds: Rounds played in the season
+            rng: NumPy random generator
+        
+        Returns:
+            Dictionary of arrays, see run
+        """
+        n_golfers = len(initial_index)
+        window = DifferentialWindow(n_golfers)
+        self.form = None
+        for r in range(WINDOW_SIZE):
+            _, differentials = self.play(initial_index, initial_index, r, rng, gaps)
+            window.push(differentials)
+        
+        index = window.handicap_index()
+        low_index = index.copy()
+        history = np.empty((n_rounds + 1, n_golfers))
+        all_differentials = np.empty((n_rounds, n_golfers))
+        all_gross = np.empty((n_rounds, n_golfers), dtype=np.int16)
+        history[0] = index
+        
+        for r in range(n_rounds):
+            gross, differentials = self.play(initial_index, index, r, rng, gaps)
+            window.push(differentials)
+            window.adjust(exceptional_score_reduction(differentials, index))
+            
+            index = apply_caps(window.handicap_index(), low_index)
+            low_index = np.fmin(low_index, index)
+            
+            history[r + 1] = index
+            all_differentials[r] = differentials
+            all_gross[r] = gross
+        
+        return {
+            'index': history,
+            'differentials': all_differentials,
+            'gross': all_gross
+        }
@@ -0,0 +1,192 @@
+"""
+Hole Model - Per-hole expected strokes from par, yardage and hole handicap
+"""
+import numpy as np
+
+from score_model import HANDICAP_BRACKETS, difficulty_bucket, load_score_model
+
+
+# Holes in a standard round; hole handicaps and the score model use this scale
+STANDARD_HOLES = 18
+
+# Typical hole length for each par, used to judge long and short holes
+TYPICAL_YARDAGE = {3: 165, 4: 385, 5: 510, 6: 620}
+
+# Extra strokes per 100 yards over typical length, and the largest effect
+YARDAGE_EFFECT = 0.25
+MAX_YARDAGE_EFFECT = 0.5
+
+# Limits on how much hole length scales the per-hole variance
+MIN_SPREAD = 0.75
+MAX_SPREAD = 1.25
+
+
+def typical_yardage(par_values):
+    """
+    Look up the typical length of holes
+    
+    Args:
+        par_values: Par values, any shape
+    
+    Returns:
+        Typical yardage for each hole's par
+    """
+    pars = sorted(TYPICAL_YARDAGE)
+    typical = [TYPICAL_YARDAGE[p] for p in pars]
+    return np.interp(par_values, pars, typical)
+
+
+def yardage_adjustments(par_values, yardages):
+    """
+    Shift of each hole's mean and scale of its variance from its length
+    
+    A hole longer than typical for its par is harder and more variable.
+    Both are centred over the holes of a course (the last axis), because
+    the course rating already accounts for overall length.
+    
+    Args:
+        par_values: Par values, shape (..., n_holes)
+        yardages: Yardages, same shape
+    
+    Returns:
+        Tuple of (length effect in strokes, variance multiplier), each of
+        the input shape
+    """
+    yardages = np.asarray(yardages, dtype=float)
+    typical = typical_yardage(par_values)
+    effect = np.clip(YARDAGE_EFFECT * (yardages - typical) / 100.0,
+                     -MAX_YARDAGE_EFFECT, MAX_YARDAGE_EFFECT)
+    spread = np.clip(yardages / typical, MIN_SPREAD, MAX_SPREAD)
+    return (effect - effect.mean(axis=-1, keepdims=True),
+            spread / spread.mean(axis=-1, keepdims=True))
+
+
+def handicap_ranks(hole_handicaps):
+    """
+    Rank holes from hardest (0) to easiest by hole handicap
+    
+    Works for any stroke index numbering, e.g. 1-9 or the odd numbers 1-17
+    on a 9-hole layout.
+    
+    Args:
+        hole_handicaps: Hole handicap indexes, shape (..., n_holes)
+    
+    Returns:
+        Integer ranks 0..n_holes-1 along the last axis
+    """
+    order = np.argsort(hole_handicaps, axis=-1, kind='stable')
+    return np.argsort(order, axis=-1, kind='stable')
+
+
+def standard_handicaps(hole_handicaps):
+    """
+    Map hole handicaps of any layout onto the 18-hole scale
+    
+    Args:
+        hole_handicaps: Hole handicap indexes, shape (..., n_holes)
+    
+    Returns:
+        Equivalent 18-hole handicaps (1-18); unchanged for 18 holes
+    """
+    n_holes = np.shape(hole_handicaps)[-1]
+    ranks = handicap_ranks(hole_handicaps)
+    return np.ceil((ranks + 1) * STANDARD_HOLES / n_holes).astype(np.int16)
+
+
+class HoleModel:
+    """
+    Expected strokes and variance of every hole on a course
+    
+    Hole handicap sets the difficulty bucket factor, as before. Yardage
+    shifts strokes between holes: a hole longer than typical for its par is
+    harder and more variable. The yardage effects are centred over the
+    course, because the course rating already accounts for overall length,
+    and are left out when the score model was calibrated without yardages.
+    
+    The means and variances are precomputed for every handicap bracket of
+    the score model, so generation only looks up one vector per round.
+    Layouts of any length are supported; hole handicaps are ranked onto the
+    18-hole scale to pick difficulty buckets.
+    """
+    
+    def __init__(self, par_values, hole_handicaps, yardages=None, score_model=None):
+        """
+        Initialize a hole model
+        
+        Args:
+            par_values: List of par values, one per hole
+            hole_handicaps: List of hole handicap indexes
+            yardages: Optional list of yardages
+            score_model: Optional ScoreModel; defaults to the fitted model
+        """
+        self.par_values = np.asarray(par_values, dtype=np.int16)
+        self.hole_handicaps = np.asarray(hole_handicaps, dtype=np.int16)
+        self.n_holes = len(self.par_values)
+        self.bucket = difficulty_bucket(standard_handicaps(self.hole_handicaps))
+        self.score_model = score_model or load_score_model()
+        
+        # A model calibrated without yardages already has their spread in
+        # hole_sigma, so adding the length effects again would count it twice
+        if yardages is None or not self.score_model.yardage_adjusted:
+            self.length_effect = np.zeros(len(self.par_values))
+            self.spread = np.ones(len(self.par_values))
+        else:
+            self.length_effect, self.spread = yardage_adjustments(self.par_values, yardages)
+        
+        # One row per handicap bracket
+        params = self.score_model.param_arrays(np.asarray(HANDICAP_BRACKETS))
+        self.means, self.variances = self.hole_parameters(params)
+        self.sigmas = np.sqrt(self.variances)
+        self.round_sigma = params['round_sigma']
+    
+    @classmethod
+    def from_course(cls, course_data, score_model=None):
+        """
+        Create a hole model from a CourseManager course dictionary
+        
+        Args:
+            course_data: Course data dictionary
+            score_model: Optional ScoreModel
+        
+        Returns:
+            HoleModel instance
+        """
+        return cls(
+            course_data['par_values'],
+            course_data['hole_handicaps'],
+            course_data.get('yardages'),
+            score_model
+        )
+    
+    def hole_parameters(self, params):
+        """
+        Calculate hole means and variances for a set of parameters
+        
+        The means exclude the player's share of the course handicap, which
+        is added per round.
+        
+        Args:
+            params: Parameter dictionary of scalars or arrays of shape (b,)
+        
+        Returns:
+            Tuple of (means, variances), each of shape (n_holes,) or (b, n_holes)
+        """
+        factors = np.stack([np.asarray(params['hard_factor'], dtype=float),
+                            np.asarray(params['medium_factor'], dtype=float),
+                            np.asarray(params['easy_factor'], dtype=float)], axis=-1)
+        means = self.par_values + self.length_effect + factors[..., self.bucket]
+        sigma = np.asarray(params['hole_sigma'], dtype=float)[..., np.newaxis]
+        variances = sigma ** 2 * self.spread
+        return means, variances
+    
+    def bracket_of(self, handicap_index):
+        """
+        Find the handicap bracket (row of means/variances) of each index
+        
+        Args:
+            handicap_index: Handicap index, scalar or array
+        
+        Returns:
+            Bracket number(s)
+        """
+        return self.score_model.bracket_of(handicap_index)
@@ -0,0 +1,222 @@
+"""
+Index Solver - Handicap index a ghost needs to reach a target score
+"""
+import sys
+
+import numpy as np
+
+from batch_generator import BatchGenerator
+from course_manager import CourseManager, course_hash
+from result_cache import GenerationCache
+from score_distribution import DISTRIBUTION_SAMPLES
+from score_model import load_score_model
+
+
+# Handicap indexes searched, in WHS steps; negative indexes are plus handicaps
+MIN_INDEX = -5.0
+MAX_INDEX = 54.0
+INDEX_STEP = 0.1
+
+
+def index_grid():
+    """Every handicap index the solver can return, ascending"""
+    n_steps = int(round((MAX_INDEX - MIN_INDEX) / INDEX_STEP))
+    return np.round(MIN_INDEX + INDEX_STEP * np.arange(n_steps + 1), 1)
+
+
+class ScoreCDF:
+    """
+    Gross score distribution of a course over the whole index range
+    
+    An index affects scores through its course handicap and through the
+    score model bracket its parameters come from. Over the index grid the
+    (course handicap, bracket) pair takes a few dozen values, and indexes
+    sharing a pair generate identical rounds, so one simulated CDF per pair
+    answers any question about any index. Row r holds P(gross <= score)
+    for the r-th pair in index order; rows are made non-increasing so a
+    worse player is never more likely to break a score, which keeps the
+    solution unique despite sampling noise.
+    """
+    
+    def __init__(self, score_min, cdf, indexes, index_rows):
+        """
+        Initialize a table
+        
+        Use ScoreCDF.build instead.
+        
+        Args:
+            score_min: Lowest possible gross score
+            cdf: Array of shape (r, s) of P(gross <= score_min + j)
+            indexes: Index grid, shape (i,)
+            index_rows: Row of each grid index, non-decreasing, shape (i,)
+        """
+        self.score_min = score_min
+        self.cdf = cdf
+        self.indexes = indexes
+        self.index_rows = index_rows
+    
+    @classmethod
+    def build(cls, course_data, generation_cache, n_samples=DISTRIBUTION_SAMPLES,
+              hole_model=None):
+        """
+        Simulate the table of a course
+        
+        Args:
+            course_data: Course data dictionary
+            generation_cache: GenerationCache supplying one batch per row
+            n_samples: Rounds per row
+            hole_model: Optional cached HoleModel for the course
+        
+        Returns:
+            ScoreCDF
+        """
+        generator = BatchGenerator.from_course(course_data, hole_model)
+        indexes = index_grid()
+        # Both go up with the index, so the distinct pairs come out in index order
+        pairs = np.stack([generator.course_handicap(indexes),
+                          generator.hole_model.bracket_of(indexes)], axis=1)
+        _, first, index_rows = np.unique(pairs, axis=0, return_index=True, return_inverse=True)
+        
+        # Gross scores are clipped to par - 1 .. par + 6 on every hole
+        par = int(np.sum(course_data['par_values']))
+        n_holes = generator.n_holes
+        score_min = par - n_holes
+        counts = np.zeros((len(first), 7 * n_holes + 1))
+        for row, position in enumerate(first):
+            batch = generation_cache.get_or_generate(course_data, float(indexes[position]),
+                                                     n_samples, hole_model)
+            counts[row] = np.bincount(batch.gross_totals() - score_min,
+                                      minlength=counts.shape[1])
+        
+        cdf = np.cumsum(counts, axis=1) / counts.sum(axis=1, keepdims=True)
+        cdf = np.minimum.accumulate(cdf, axis=0)
+        return cls(score_min, cdf, indexes, index_rows.ravel())
+    
+    def score_columns(self, targets):
+        """Column of each target score, clipped to the table"""
+        columns = np.asarray(targets, dtype=np.int64) - self.score_min
+        return np.clip(columns, -1, self.cdf.shape[1] - 1)
+    
+    def probability(self, handicap_index, targets):
+        """
+        Probability of shooting a target gross score or better
+        
+        Args:
+            handicap_index: Handicap index, scalar or array
+            targets: Target gross scores, broadcast against handicap_index
+        
+        Returns:
+            Array of probabilities
+        """
+        handicap_index, columns = np.broadcast_arrays(np.asarray(handicap_index, dtype=float),
+                                                      self.score_columns(targets))
+        grid = np.clip(np.round((handicap_index - MIN_INDEX) / INDEX_STEP).astype(np.int64),
+                       0, len(self.indexes) - 1)
+        rows = self.index_rows[grid]
+        return np.where(columns < 0, 0.0, self.cdf[rows, np.maximum(columns, 0)])
+    
+    def solve(self, targets, probability=0.5):
+        """
+        Find the highest index that shoots each target or better often enough
+        
+        Args:
+            targets: Target gross scores, scalar or array
+            probability: Required probability, broadcast against targets
+        
+        Returns:
+            Array of handicap indexes; NaN where even the lowest index
+            falls short, MAX_INDEX where every index is good enough
+        """
+        columns, probability = np.broadcast_arrays(self.score_columns(targets),
+                                                   np.asarray(probability, dtype=float))
+        # Rows are non-increasing, so the rows meeting the probability
+        # are a prefix whose length is the count of rows meeting it
+        p = np.where(columns < 0, 0.0, self.cdf[:, np.maximum(columns, 0)])
+        n_ok = np.sum(p >= probability, axis=0)
+        position = np.searchsorted(self.index_rows, n_ok - 1, side='right') - 1
+        return np.where(n_ok > 0, self.indexes[position], np.nan)
+
+
+class IndexSolver:
+    """
+    Answers "what index shoots this score this often?" for saved courses
+    
+    One ScoreCDF is built per course on first use and kept, keyed by the
+    course content and score model so edits give a fresh table.
+    """
+    
+    def __init__(self, course_manager, generation_cache=None, n_samples=DISTRIBUTION_SAMPLES):
+        """
+        Initialize a solver
+        
+        Args:
+            course_manager: CourseManager with the courses to solve for
+            generation_cache: Optional GenerationCache to draw batches from
+            n_samples: Rounds simulated per table row
+        """
+        self.course_manager = course_manager
+        self.generation_cache = generation_cache or GenerationCache(course_manager)
+        self.n_samples = n_samples
+        self.tables = {}
+    
+    def table(self, course_name):
+        """
+        Get the score table of a course, simulating it on first use
+        
+        Args:
+            course_name: Name of the course
+        
+        Returns:
+            ScoreCDF or None if the course does not exist
+        """
+        course_data = self.course_manager.get_course(course_name)
+        if not course_data:
+            return None
+        key = (course_hash(course_data), load_score_model().fingerprint(), self.n_samples)
+        if key not in self.tables:
+            self.tables[key] = ScoreCDF.build(
+                course_data, self.generation_cache, self.n_samples,
+                self.course_manager.get_hole_model(course_name))
+        return self.tables[key]
+    
+    def solve(self, course_name, targets, probability=0.5):
+        """
+        Find the highest index that shoots each target gross or better
+        
+        Args:
+            course_name: Name of the course
+            targets: Target gross scores, scalar or array
+            probability: Required probability, broadcast against targets
+        
+        Returns:
+            Array of handicap indexes, see ScoreCDF.solve
+        """
+        return self.table(course_name).solve(targets, probability)
+
+
+def main():
+    """
+    Command line entry point:
+    index_solver.py COURSE TARGET [PROBABILITY]
+    """
+    if len(sys.argv) < 3:
+        print("Usage: python index_solver.py COURSE TARGET [PROBABILITY]")
+        return 1
+    course_name, target = sys.argv[1], int(sys.argv[2])
+    probability = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+    
+    solver = IndexSolver(CourseManager())
+    if solver.table(course_name) is None:
+        print(f"Course not found: {course_name}")
+        return 1
+    index = float(solver.solve(course_name, target, probability))
+    if np.isnan(index):
+        print(f"No index shoots {target} or better {probability:.0%} of the time")
+    else:
+        shown = f"+{-index:.1f}" if index < 0 else f"{index:.1f}"
+        print(f"Index {shown} or lower shoots {target} or better {probability:.0%} of the time")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,15 @@
 """
 Golf Ghost Analytics - Main Application
 """
+import queue
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 from ghost_golfer import GhostGolfer
 from course_manager import CourseManager
+from course_watcher import CourseWatcher
+from result_cache import GenerationCache
+from score_distribution import ScoreDistributions
 from ui_theme import DarkAnalyticsTheme
 from ui_components import (
     create_header,
@@ -18,6 +22,10 @@ from generate_tab import GenerateTab
 from manage_tab import ManageTab
 
 
+# How often the Tk thread picks up course reloads
+WATCH_POLL_MS = 250
+
+
 class GolfGhostApp:
     """Main application class"""
     
@@ -30,6 +38,9 @@ class GolfGhostApp:
         self.theme = DarkAnalyticsTheme()
         self.course_manager = CourseManager()
         
+        # Score distributions are kept across tab switches
+        self.distributions = ScoreDistributions(GenerationCache(self.course_manager))
+        
         # Apply theme
         self.root.configure(bg=self.theme.colors['bg_primary'])
         self.theme.setup_styles(self.root)
@@ -55,6 +66,15 @@ class GolfGhostApp:
         
         # Show generate tab by default
         self.show_generate_tab()
+        
+        # Reload courses edited outside the app; changes found on the
+        # watcher thread are applied on the Tk thread
+        self.pending_reloads = queue.Queue()
+        self.course_manager.subscribe(self.on_courses_changed)
+        self.course_watcher = CourseWatcher(self.course_manager,
+                                            dispatch=self.pending_reloads.put)
+        self.course_watcher.start()
+        self.root.after(WATCH_POLL_MS, self.apply_pending_reloads)
     
     def create_tab_bar(self):
         """Create tab navigation bar"""
@@ -98,7 +118,8 @@ class GolfGhostApp:
         self.generate_tab = GenerateTab(
             self.content_frame, 
             self.theme, 
-            self.course_manager
+            self.course_manager,
+            self.distributions
         )
         self.current_tab = 'generate'
     
@@ -119,6 +140,23 @@ class GolfGhostApp:
         if self.generate_tab:
             self.generate_tab.refresh_course_list()
     
+    def on_courses_changed(self, course_name, old_data, new_data):
+        """CourseManager listener: refresh the course list on screen"""
+        if self.current_tab == 'generate' and self.generate_tab:
+            self.generate_tab.refresh_course_list()
+        elif self.current_tab == 'manage' and self.manage_tab:
+            self.manage_tab.update_courses_list()
+    
+    def apply_pending_reloads(self):
+        """Apply course reloads queued by the watcher thread"""
+        while True:
+            try:
+                apply = self.pending_reloads.get_nowait()
+            except queue.Empty:
+                break
+            apply()
+        self.root.after(WATCH_POLL_MS, self.apply_pending_reloads)
+    
     def clear_content(self):
         """Clear the content frame"""
         for widget in self.content_frame.winfo_children():
@@ -2,8 +2,17 @@
 Manage Tab - UI for managing golf courses
 """
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, messagebox
 
+from course_manager import VALID_HOLE_COUNTS
+from rating_estimator import (
+    RATING_TOLERANCE,
+    SLOPE_TOLERANCE,
+    calibrate_catalog,
+    estimate_course,
+    within_tolerance
+)
+from stroke_index import suggest_hole_handicaps
 from ui_components import (
     create_button,
     create_card_frame,
@@ -28,6 +37,7 @@ class ManageTab:
         self.tee_name = tk.StringVar(value="Blue")
         self.course_rating = tk.StringVar(value="72.3")
         self.slope_rating = tk.StringVar(value="130")
+        self.hole_count = tk.StringVar(value="18")
         self.hole_inputs = []
         
         # Create UI
@@ -101,6 +111,7 @@ class ManageTab:
         self.create_simple_field(editor_frame, "TEE NAME", self.tee_name)
         self.create_simple_field(editor_frame, "COURSE RATING", self.course_rating)
         self.create_simple_field(editor_frame, "SLOPE RATING", self.slope_rating)
+        self.create_hole_count_selector(editor_frame)
         
         # Divider
         divider = tk.Frame(editor_frame, bg=self.theme.colors['border'], height=2)
@@ -115,18 +126,57 @@ class ManageTab:
         )
         holes_header.pack(pady=(0, 15), padx=30, anchor='w')
         
-        # Create 18 hole inputs
-        for hole_num in range(1, 19):
-            self.create_hole_input_group(editor_frame, hole_num)
-            
-            # Divider after hole 9
-            if hole_num == 9:
-                nine_divider = tk.Frame(editor_frame, bg=self.theme.colors['border'], height=1)
-                nine_divider.pack(fill='x', padx=30, pady=15)
+        # Hole inputs, rebuilt when the hole count changes
+        self.holes_frame = tk.Frame(editor_frame, bg=self.theme.colors['bg_card'])
+        self.holes_frame.pack(fill='x')
+        self.build_hole_inputs()
         
         # Buttons
         self.create_button_panel(editor_frame)
     
+    def create_hole_count_selector(self, parent):
+        """Create the number of holes dropdown"""
+        container = tk.Frame(parent, bg=self.theme.colors['bg_card'])
+        container.pack(fill='x', padx=30, pady=(0, 15))
+        
+        label = tk.Label(
+            container, text="HOLES",
+            font=('Arial', 9, 'bold'),
+            bg=self.theme.colors['bg_card'],
+            fg=self.theme.colors['text_muted']
+        )
+        label.pack(anchor='w', pady=(0, 5))
+        
+        dropdown = ttk.Combobox(
+            container, textvariable=self.hole_count,
+            style='Dark.TCombobox',
+            font=('Arial', 11),
+            state='readonly',
+            values=[str(n) for n in VALID_HOLE_COUNTS]
+        )
+        dropdown.pack(fill='x')
+        dropdown.bind('<<ComboboxSelected>>', lambda e: self.build_hole_inputs())
+    
+    def build_hole_inputs(self):
+        """Create one input group per hole, keeping values already entered"""
+        previous = [{key: var.get() for key, var in hole_data.items()}
+                    for hole_data in self.hole_inputs]
+        for widget in self.holes_frame.winfo_children():
+            widget.destroy()
+        self.hole_inputs = []
+        
+        n_holes = int(self.hole_count.get())
+        for hole_num in range(1, n_holes + 1):
+            self.create_hole_input_group(self.holes_frame, hole_num)
+            if hole_num <= len(previous):
+                for key, value in previous[hole_num - 1].items():
+                    self.hole_inputs[-1][key].set(value)
+            
+            # Divider after each nine
+            if hole_num % 9 == 0 and hole_num < n_holes:
+                nine_divider = tk.Frame(self.holes_frame, bg=self.theme.colors['border'], height=1)
+                nine_divider.pack(fill='x', padx=30, pady=15)
+    
     def create_simple_field(self, parent, label_text, var):
         """Create a simple input field"""
         container = tk.Frame(parent, bg=self.theme.colors['bg_card'])
@@ -285,7 +335,15 @@ class ManageTab:
         
         clear_btn = create_button(button_frame, "CLEAR", self.clear_fields,
                                   self.theme, 'secondary')
-        clear_btn.pack(side='left')
+        clear_btn.pack(side='left', padx=(0, 10))
+        
+        suggest_btn = create_button(button_frame, "🎯 SUGGEST HCP", self.suggest_handicaps,
+                                    self.theme, 'secondary')
+        suggest_btn.pack(side='left', padx=(0, 10))
+        
+        estimate_btn = create_button(button_frame, "📐 ESTIMATE RATING", self.estimate_rating,
+                                     self.theme, 'secondary')
+        estimate_btn.pack(side='left')
     
     def save_course(self):
         """Save the current course"""
@@ -339,6 +397,91 @@ class ManageTab:
         except ValueError as e:
             messagebox.showerror("Error", f"Please check your input values: {e}")
     
+    def read_hole_values(self):
+        """
+        Read par and yardage of every hole from the inputs
+        
+        Returns:
+            Tuple of (par list, yardage list), or None after showing an error
+        """
+        par_list = []
+        yardage_list = []
+        for i, hole_data in enumerate(self.hole_inputs):
+            try:
+                par_list.append(int(hole_data['par'].get()))
+                yardage_list.append(int(hole_data['yardage'].get()))
+            except ValueError:
+                messagebox.showerror("Error", f"Invalid value in Hole {i+1}")
+                return None
+        return par_list, yardage_list
+    
+    def suggest_handicaps(self):
+        """Offer hole handicaps derived from simulated scoring on the holes"""
+        holes = self.read_hole_values()
+        if holes is None:
+            return
+        par_list, yardage_list = holes
+        
+        self.main_frame.config(cursor='watch')
+        self.main_frame.update_idletasks()
+        try:
+            suggested = suggest_hole_handicaps({'par_values': par_list, 'yardages': yardage_list})
+        finally:
+            self.main_frame.config(cursor='')
+        
+        lines = [f"Holes {start + 1}-{start + 9}:  "
+                 + "  ".join(str(h) for h in suggested[start:start + 9])
+                 for start in range(0, len(suggested), 9)]
+        if messagebox.askyesno("Suggested Handicaps",
+                               "Replace the hole handicaps with these?\n\n" + "\n".join(lines)
+                               + "\n\nHardest holes for bogey golfers against scratch "
+                               "golfers come first, alternating between nines."):
+            for hole_data, hcp in zip(self.hole_inputs, suggested):
+                hole_data['handicap'].set(str(hcp))
+    
+    def estimate_rating(self):
+        """
+        Offer a provisional course rating and slope from par and yardage
+        
+        Estimates are calibrated on the other rated courses of the catalog
+        and only offered as replacements when their leave-one-out error is
+        within tolerance; otherwise they are shown for reference.
+        """
+        holes = self.read_hole_values()
+        if holes is None:
+            return
+        par_list, yardage_list = holes
+        
+        self.main_frame.config(cursor='watch')
+        self.main_frame.update_idletasks()
+        try:
+            calibration = calibrate_catalog(self.course_manager,
+                                            exclude=self.new_course_name.get().strip())
+            rating, slope = estimate_course(par_list, yardage_list, calibration=calibration)
+        finally:
+            self.main_frame.config(cursor='')
+        
+        if calibration['rating_margin'] is None:
+            estimate = (f"Course rating {rating:.1f}, slope {slope}\n\n"
+                        f"Calibrated on {calibration['courses']} rated course(s); at least "
+                        "two with yardages are needed to measure the error.")
+        else:
+            estimate = (f"Course rating {rating:.1f} ± {calibration['rating_margin']:.1f}, "
+                        f"slope {slope} ± {calibration['slope_margin']}\n\n"
+                        f"Calibrated on {calibration['courses']} rated courses; the margins "
+                        "are the worst error when a course is left out.")
+        
+        if not within_tolerance(calibration):
+            messagebox.showinfo("Estimated Rating",
+                                estimate + f"\n\nNot filled in: estimates must be within "
+                                f"{RATING_TOLERANCE:.1f} strokes and {SLOPE_TOLERANCE} points "
+                                "of slope. Enter the official rating and slope.")
+        elif messagebox.askyesno("Estimated Rating",
+                                 estimate + "\n\nProvisional values estimated from par and "
+                                 "yardage. Replace the course rating and slope with these?"):
+            self.course_rating.set(f"{rating:.1f}")
+            self.slope_rating.set(str(slope))
+    
     def delete_course(self):
         """Delete the selected course"""
         course_name = self.new_course_name.get().strip()
@@ -362,13 +505,13 @@ class ManageTab:
         self.course_rating.set("72.3")
         self.slope_rating.set("130")
         
-        # Clear hole inputs
+        # Clear hole inputs; longer layouts repeat the 18-hole defaults
         default_pars = [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 5, 4, 3, 4, 4, 3, 5, 4]
         default_yards = [395, 405, 185, 520, 380, 410, 165, 390, 535, 400, 545, 385, 175, 395, 420, 190, 510, 410]
         
         for i, hole_data in enumerate(self.hole_inputs):
-            hole_data['par'].set(str(default_pars[i]))
-            hole_data['yardage'].set(str(default_yards[i]))
+            hole_data['par'].set(str(default_pars[i % 18]))
+            hole_data['yardage'].set(str(default_yards[i % 18]))
             hole_data['handicap'].set(str(i + 1))
     
     def update_courses_list(self):
@@ -389,6 +532,8 @@ class ManageTab:
                 self.tee_name.set(course_data['tee_name'])
                 self.course_rating.set(str(course_data['course_rating']))
                 self.slope_rating.set(str(course_data['slope_rating']))
+                self.hole_count.set(str(len(course_data['par_values'])))
+                self.build_hole_inputs()
                 
                 # Load hole data
                 for i, hole_data in enumerate(self.hole_inputs):
@@ -0,0 +1,444 @@
+"""
+Rating Estimator - Provisional course rating and slope from par and yardage
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from course_manager import CourseManager
+from course_table import pack_courses
+from hole_model import STANDARD_HOLES
+from rng import CounterRNG
+from shot_simulator import ShotSimulator
+from stroke_index import HIGH_INDEX, LOW_INDEX
+
+
+# Bump when the shot simulator changes, so cached fits are refitted
+RATING_MODEL_VERSION = 3
+RATING_MODEL_FILE = "rating_model.json"
+
+# Slope is 5.381 times the bogey rating minus the scratch rating (USGA,
+# men), on the 18-hole scale, within the allowed range
+SLOPE_FACTOR = 5.381
+MIN_SLOPE = 55
+MAX_SLOPE = 155
+
+# The simulator's raw ratings run high and its scratch-to-bogey gap narrow,
+# so estimates are calibrated on the catalog's officially rated courses.
+# The course editor only fills in estimates whose leave-one-out error over
+# those courses is within these tolerances
+RATING_TOLERANCE = 1.0
+SLOPE_TOLERANCE = 5
+
+# Synthetic holes the regression is fitted on; par 3s get their own curve
+SHORT_YARDAGES = np.arange(90, 271, 10)
+LONG_YARDAGES = np.arange(250, 661, 10)
+LONG_PAR_5_FROM = 470
+FIT_DEGREE = 2
+FIT_ROUNDS = 4000
+FIT_SEED = 0
+
+
+class RatingModel:
+    """
+    Expected strokes of scratch and bogey golfers on a hole of given length
+    
+    Fitted once from the shot simulator: synthetic holes across the range
+    of yardages are played by both populations and a quadratic in yardage
+    is fitted to each, separately for par 3s and longer holes. The sum over
+    a course's holes gives its scratch and bogey ratings, from which the
+    slope follows, for every course of a catalog at once.
+    
+    Raw estimates are off by several strokes and up to 20 points of slope
+    (Baytree blue comes out at 71.3 / 108 against 69.7 / 126), so they
+    are meant to be calibrated with calibrate_catalog before use.
+    """
+    
+    POPULATIONS = {'scratch': LOW_INDEX, 'bogey': HIGH_INDEX}
+    
+    def __init__(self, coefficients):
+        """
+        Initialize a rating model
+        
+        Args:
+            coefficients: {'scratch' | 'bogey': {'short' | 'long': polynomial
+                coefficients, highest power first}}
+        """
+        self.coefficients = coefficients
+    
+    @classmethod
+    def fit(cls, n_rounds=FIT_ROUNDS):
+        """
+        Fit the model by simulating synthetic holes
+        
+        Args:
+            n_rounds: Rounds simulated per population
+        
+        Returns:
+            RatingModel instance
+        """
+        yardages = np.concatenate([SHORT_YARDAGES, LONG_YARDAGES])
+        par = np.concatenate([np.full(len(SHORT_YARDAGES), 3),
+                              np.where(LONG_YARDAGES < LONG_PAR_5_FROM, 4, 5)])
+        short = par == 3
+        simulator = ShotSimulator(113, par, np.arange(1, len(par) + 1), yardages.tolist())
+        
+        coefficients = {}
+        for population, index in cls.POPULATIONS.items():
+            strokes = simulator.generate(index, n_rounds, CounterRNG(FIT_SEED)).gross.mean(axis=0)
+            coefficients[population] = {
+                'short': np.polyfit(yardages[short], strokes[short], FIT_DEGREE).tolist(),
+                'long': np.polyfit(yardages[~short], strokes[~short], FIT_DEGREE).tolist()
+            }
+        return cls(coefficients)
+    
+    @classmethod
+    def load(cls, filename):
+        """
+        Load a fitted model from a JSON file
+        
+        Args:
+            filename: JSON file written by RatingModel.save
+        
+        Returns:
+            RatingModel instance, or None if missing, unreadable or stale
+        """
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    data = json.load(f)
+                if data.get('version') == RATING_MODEL_VERSION:
+                    return cls(data['coefficients'])
+            except Exception as e:
+                print(f"Error loading rating model: {e}")
+        return None
+    
+    def save(self, filename):
+        """
+        Save the model to a JSON file
+        
+        Args:
+            filename: JSON file to write
+        
+        Returns:
+            True if saved successfully
+        """
+        try:
+            with open(filename, 'w') as f:
+                json.dump({'version': RATING_MODEL_VERSION,
+                           'coefficients': self.coefficients}, f, indent=2)
+            return True
+        except Exception as e:
+            print(f"Error saving rating model: {e}")
+            return False
+    
+    def hole_strokes(self, population, par_values, yardages):
+        """
+        Expected strokes on holes
+        
+        Args:
+            population: 'scratch' or 'bogey'
+            par_values: Par values, any shape
+            yardages: Yardages, same shape
+        
+        Returns:
+            Array of expected strokes
+        """
+        fits = self.coefficients[population]
+        yardages = np.asarray(yardages, dtype=float)
+        return np.where(np.asarray(par_values) <= 3,
+                        np.polyval(fits['short'], yardages),
+                        np.polyval(fits['long'], yardages))
+    
+    def estimate(self, par_values, yardages, n_holes, calibration=None):
+        """
+        Estimate ratings and slopes of many courses at once
+        
+        Args:
+            par_values: Par values, shape (c, w), zero-padded
+            yardages: Yardages, shape (c, w), zero-padded
+            n_holes: Holes of each course, shape (c,)
+            calibration: Optional dictionary from calibrate_catalog; its
+                'rating_shift' (strokes per 18 holes) is added to the
+                scratch rating and its 'slope_scale' widens the gap to
+                the bogey rating
+        
+        Returns:
+            Tuple of (course rating, bogey rating, slope rating) arrays of
+            shape (c,)
+        """
+        scratch, bogey = self.raw_ratings(par_values, yardages, n_holes)
+        n_holes = np.asarray(n_holes)
+        if calibration:
+            gap = (bogey - scratch) * calibration['slope_scale']
+            scratch = scratch + calibration['rating_shift'] * n_holes / STANDARD_HOLES
+            bogey = scratch + gap
+        slope = SLOPE_FACTOR * (bogey - scratch) * STANDARD_HOLES / n_holes
+        slope = np.clip(np.round(slope), MIN_SLOPE, MAX_SLOPE).astype(int)
+        return np.round(scratch, 1), np.round(bogey, 1), slope
+    
+    def raw_ratings(self, par_values, yardages, n_holes):
+        """
+        Uncalibrated, unrounded scratch and bogey ratings of many courses
+        
+        Args:
+            par_values: Par values, shape (c, w), zero-padded
+            yardages: Yardages, shape (c, w), zero-padded
+            n_holes: Holes of each course, shape (c,)
+        
+        Returns:
+            Tuple of (scratch rating, bogey rating) arrays of shape (c,)
+        """
+        n_holes = np.asarray(n_holes)
+        played = np.arange(np.shape(par_values)[1]) < n_holes[:, np.newaxis]
+        scratch = np.where(played, self.hole_strokes('scratch', par_values, yardages), 0)
+        bogey = np.where(played, self.hole_strokes('bogey', par_values, yardages), 0)
+        return scratch.sum(axis=1), bogey.sum(axis=1)
+
+
+def fit_calibration(scratch, bogey, n_holes, official_rating, official_slope):
+    """
+    Fit the rating shift and slope scale mapping raw to official ratings
+    
+    Args:
+        scratch: Raw scratch ratings from RatingModel.raw_ratings, shape (c,)
+        bogey: Raw bogey ratings, shape (c,)
+        n_holes: Holes of each course, shape (c,)
+        official_rating: Stored course ratings, shape (c,)
+        official_slope: Stored slope ratings, shape (c,)
+    
+    Returns:
+        Dictionary with 'rating_shift' (mean error per 18 holes) and
+        'slope_scale' (mean ratio of official to raw slope); no shift and
+        unit scale when there are no courses
+    """
+    if len(scratch) == 0:
+        return {'rating_shift': 0.0, 'slope_scale': 1.0}
+    per_round = STANDARD_HOLES / np.asarray(n_holes)
+    raw_slope = SLOPE_FACTOR * (bogey - scratch) * per_round
+    return {
+        'rating_shift': float(np.mean((official_rating - scratch) * per_round)),
+        'slope_scale': float(np.mean(official_slope / raw_slope))
+    }
+
+
+_rating_models = {}
+
+
+def load_rating_model(filename=RATING_MODEL_FILE):
+    """
+    Load the rating model, fitting and saving it on first use
+    
+    Args:
+        filename: JSON file caching the fitted model
+    
+    Returns:
+        RatingModel instance
+    """
+    if filename not in _rating_models:
+        model = RatingModel.load(filename)
+        if model is None:
+            model = RatingModel.fit()
+            model.save(filename)
+        _rating_models[filename] = model
+    return _rating_models[filename]
+
+
+def rated_courses(course_manager, exclude=None):
+    """
+    Pack the catalog's courses that have yardages
+    
+    Args:
+        course_manager: CourseManager holding the catalog
+        exclude: Optional course name to leave out
+    
+    Returns:
+        Tuple of (list of names, packed course table), or (names, None)
+        when no course has yardages
+    """
+    names = [n for n in course_manager.get_all_courses()
+             if n != exclude and course_manager.get_course(n).get('yardages')]
+    if not names:
+        return names, None
+    return names, pack_courses([course_manager.get_course(n) for n in names], names)
+
+
+def leave_one_out(model, table):
+    """
+    Calibrated estimates of each course from a fit on the other courses
+    
+    Args:
+        model: RatingModel
+        table: Packed course table from rated_courses
+    
+    Returns:
+        Tuple of (course rating, bogey rating, slope rating) arrays, each
+        course estimated without its own official ratings
+    """
+    scratch, bogey = model.raw_ratings(table['par_values'], table['yardages'],
+                                       table['n_holes'])
+    n = len(table)
+    estimates = []
+    for i in range(n):
+        others = np.arange(n) != i
+        calibration = fit_calibration(scratch[others], bogey[others], table['n_holes'][others],
+                                      table['course_rating'][others],
+                                      table['slope_rating'][others])
+        estimates.append(model.estimate(table['par_values'][i:i + 1], table['yardages'][i:i + 1],
+                                        table['n_holes'][i:i + 1], calibration))
+    return tuple(np.concatenate(column) for column in zip(*estimates))
+
+
+def calibrate_catalog(course_manager, model=None, exclude=None):
+    """
+    Calibrate the rating model on the catalog's official ratings
+    
+    Every course with yardages contributes; the error margin is the worst
+    leave-one-out error, i.e. how far a course's estimate lands from its
+    official ratings when it is left out of the calibration.
+    
+    Args:
+        course_manager: CourseManager holding the catalog
+        model: Optional RatingModel, defaults to the cached fit
+        exclude: Optional course name to leave out, such as the course
+            being edited
+    
+    Returns:
+        Calibration dictionary for RatingModel.estimate, with 'courses'
+        (number of rated courses used) and 'rating_margin' and
+        'slope_margin' (None with fewer than two courses)
+    """
+    model = model or load_rating_model()
+    names, table = rated_courses(course_manager, exclude)
+    if table is None:
+        calibration = fit_calibration([], [], [], [], [])
+        calibration.update(courses=0, rating_margin=None, slope_margin=None)
+        return calibration
+    
+    scratch, bogey = model.raw_ratings(table['par_values'], table['yardages'],
+                                       table['n_holes'])
+    calibration = fit_calibration(scratch, bogey, table['n_holes'],
+                                  table['course_rating'], table['slope_rating'])
+    calibration.update(courses=len(names), rating_margin=None, slope_margin=None)
+    if len(names) >= 2:
+        rating, _, slope = leave_one_out(model, table)
+        calibration['rating_margin'] = round(float(np.abs(rating - table['course_rating']).max()), 1)
+        calibration['slope_margin'] = int(np.abs(slope - table['slope_rating']).max())
+    return calibration
+
+
+def within_tolerance(calibration):
+    """
+    Check whether calibrated estimates are accurate enough to fill in
+    
+    Args:
+        calibration: Dictionary from calibrate_catalog
+    
+    Returns:
+        True if both error margins are known and within RATING_TOLERANCE
+        and SLOPE_TOLERANCE
+    """
+    return (calibration['rating_margin'] is not None
+            and calibration['rating_margin'] <= RATING_TOLERANCE
+            and calibration['slope_margin'] <= SLOPE_TOLERANCE)
+
+
+def estimate_course(par_values, yardages, model=None, calibration=None):
+    """
+    Estimate the rating and slope of one course
+    
+    Args:
+        par_values: List of par values
+        yardages: List of yardages
+        model: Optional RatingModel, defaults to the cached fit
+        calibration: Optional dictionary from calibrate_catalog
+    
+    Returns:
+        Tuple of (course rating, slope rating)
+    """
+    model = model or load_rating_model()
+    rating, _, slope = model.estimate([par_values], [yardages], [len(par_values)], calibration)
+    return float(rating[0]), int(slope[0])
+
+
+def estimate_catalog(course_manager, model=None):
+    """
+    Estimate the rating and slope of every course in one pass
+    
+    Each course is estimated with a calibration fitted on the other rated
+    courses, so the differences from its official ratings are honest
+    out-of-sample errors. A lone course is left uncalibrated.
+    
+    Args:
+        course_manager: CourseManager holding the catalog
+        model: Optional RatingModel, defaults to the cached fit
+    
+    Returns:
+        List of dictionaries with name, holes, yardage, par, the estimated
+        course_rating, bogey_rating and slope_rating, and the stored
+        official_rating and official_slope. Courses without yardages are
+        left out.
+    """
+    model = model or load_rating_model()
+    names, table = rated_courses(course_manager)
+    if table is None:
+        return []
+    if len(names) >= 2:
+        rating, bogey, slope = leave_one_out(model, table)
+    else:
+        rating, bogey, slope = model.estimate(table['par_values'], table['yardages'],
+                                              table['n_holes'])
+    return [{
+        'name': name,
+        'holes': int(table['n_holes'][i]),
+        'yardage': int(table['yardages'][i].sum()),
+        'par': int(table['par_values'][i].sum()),
+        'course_rating': float(rating[i]),
+        'bogey_rating': float(bogey[i]),
+        'slope_rating': int(slope[i]),
+        'official_rating': float(table['course_rating'][i]),
+        'official_slope': int(table['slope_rating'][i])
+    } for i, name in enumerate(names)]
+
+
+def rating_report(results):
+    """
+    Format catalog estimates as a text table
+    
+    Args:
+        results: List from estimate_catalog
+    
+    Returns:
+        Report string
+    """
+    width = max([len(r['name']) for r in results] + [6])
+    lines = [f"{'COURSE':<{width}}  HOLES  YARDS  PAR   EST CR  BOGEY  SLOPE   "
+             f"CR    SLOPE   dCR  dSLOPE"]
+    for r in results:
+        lines.append(
+            f"{r['name']:<{width}}  {r['holes']:>5}  {r['yardage']:>5}  {r['par']:>3}  "
+            f"{r['course_rating']:>7.1f}  {r['bogey_rating']:>5.1f}  {r['slope_rating']:>5}  "
+            f"{r['official_rating']:>5.1f}  {r['official_slope']:>5}  "
+            f"{r['course_rating'] - r['official_rating']:>+5.1f}  "
+            f"{r['slope_rating'] - r['official_slope']:>+6}")
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Command line entry point:
+    rating_estimator.py [COURSE_FILE]
+    """
+    filename = sys.argv[1] if len(sys.argv) > 1 else "golf_courses.json"
+    results = estimate_catalog(CourseManager(filename))
+    if not results:
+        print("No courses with yardages to estimate")
+        return 1
+    print(rating_report(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Result Cache - Reuse generated batches for repeated identical requests
+"""
+import os
+import shutil
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from batch_generator import BatchGenerator, RoundBatch
+from course_manager import course_hash
+from hole_model import STANDARD_HOLES
+from rng import CounterRNG
+from score_model import load_score_model
+
+
+# Fixed seed so cached, reloaded and recomputed batches are identical
+CACHE_SEED = 0
+
+
+def batch_nbytes(batch):
+    """Memory held by a RoundBatch's arrays"""
+    return (batch.gross.nbytes + batch.strokes_received.nbytes
+            + batch.par.nbytes + batch.course_handicap.nbytes)
+
+
+class GenerationCache:
+    """
+    Size-bounded LRU cache of generated batches
+    
+    Entries are keyed by (course content hash, course handicap, score
+    bracket, model fingerprint, sample count). A batch depends on the
+    handicap index only through its course handicap and the bracket of the
+    score model parameters, so any index sharing both gets the same batch.
+    When a CourseManager is given, entries for a course are evicted as
+    soon as add_course or delete_course changes its data.
+    An optional directory adds an on-disk tier that survives restarts.
+    
+    Safe to use from several threads: course changes arrive on the Tk
+    thread while batches are generated in the background, so every access
+    to the in-memory entries holds one lock. Generation and disk I/O run
+    outside it.
+    """
+    
+    def __init__(self, course_manager=None, max_bytes=256 * 1024 * 1024, directory=None):
+        """
+        Initialize a cache
+        
+        Args:
+            course_manager: Optional CourseManager to follow for changes
+            max_bytes: Memory budget for cached batches
+            directory: Optional directory for the on-disk tier
+        """
+        self.course_manager = course_manager
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if course_manager is not None:
+            course_manager.subscribe(self.on_course_changed)
+    
+    def make_key(self, course_data, handicap_index, n_samples):
+        """
+        Build the cache key of a request
+        
+        Args:
+            course_data: Course data dictionary
+            handicap_index: Handicap index of the ghost
+            n_samples: Number of rounds
+        
+        Returns:
+            Key tuple
+        """
+        model = load_score_model()
+        scale = len(course_data['par_values']) / STANDARD_HOLES
+        course_handicap = np.round(handicap_index * course_data['slope_rating'] / 113 * scale)
+        return (course_hash(course_data), int(course_handicap),
+                int(model.bracket_of(handicap_index)), model.fingerprint(), int(n_samples))
+    
+    def disk_path(self, key):
+        """Path of a key's file in the on-disk tier"""
+        content_hash, course_handicap, bracket, model, n_samples = key
+        return os.path.join(self.directory, content_hash,
+                            f"{course_handicap}_{bracket}_{model}_{n_samples}.npz")
+    
+    def get(self, key):
+        """
+        Look up a batch
+        
+        Args:
+            key: Key from make_key
+        
+        Returns:
+            RoundBatch or None
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        
+        if self.directory and os.path.exists(self.disk_path(key)):
+            try:
+                with np.load(self.disk_path(key)) as data:
+                    batch = RoundBatch(data['gross'], data['strokes_received'],
+                                       data['par'], data['course_handicap'])
+                self.put(key, batch, write_disk=False)
+                with self.lock:
+                    self.hits += 1
+                return batch
+            except Exception as e:
+                print(f"Error reading cached batch: {e}")
+        
+        with self.lock:
+            self.misses += 1
+        return None
+    
+    def put(self, key, batch, write_disk=True):
+        """
+        Store a batch, evicting least recently used entries over budget
+        
+        Args:
+            key: Key from make_key
+            batch: RoundBatch to store
+            write_disk: Also write the batch to the on-disk tier
+        """
+        with self.lock:
+            if key in self.entries:
+                self.size -= batch_nbytes(self.entries.pop(key))
+            self.entries[key] = batch
+            self.size += batch_nbytes(batch)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= batch_nbytes(evicted)
+        
+        if write_disk and self.directory:
+            path = self.disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                np.savez(path, gross=batch.gross, strokes_received=batch.strokes_received,
+                         par=batch.par, course_handicap=batch.course_handicap)
+            except Exception as e:
+                print(f"Error writing cached batch: {e}")
+    
+    def get_or_generate(self, course_data, handicap_index, n_samples, hole_model=None):
+        """
+        Get the batch for a request, generating it on a miss
+        
+        Args:
+            course_data: Course data dictionary
+            handicap_index: Handicap index of the ghost
+            n_samples: Number of rounds
+            hole_model: Optional cached HoleModel for the course
+        
+        Returns:
+            RoundBatch of n_samples rounds
+        """
+        key = self.make_key(course_data, handicap_index, n_samples)
+        batch = self.get(key)
+        if batch is None:
+            generator = BatchGenerator.from_course(course_data, hole_model)
+            batch = generator.generate(handicap_index, n_samples, CounterRNG(CACHE_SEED))
+            self.put(key, batch)
+        return batch
+    
+    def invalidate(self, course_data):
+        """
+        Drop every entry generated from this course data
+        
+        Args:
+            course_data: Course data dictionary whose entries are stale
+        """
+        content_hash = course_hash(course_data)
+        if self.course_manager is not None:
+            live = [course_hash(c) for c in self.course_manager.courses.values()]
+            if content_hash in live:
+                return
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == content_hash]:
+                self.size -= batch_nbytes(self.entries.pop(key))
+        if self.directory:
+            shutil.rmtree(os.path.join(self.directory, content_hash), ignore_errors=True)
+    
+    def on_course_changed(self, course_name, old_data, new_data):
+        """CourseManager listener: drop entries for the old course data"""
+        if old_data is not None:
+            self.invalidate(old_data)
+    
+    def clear(self):
+        """Drop all in-memory entries"""
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
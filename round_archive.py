@@ -0,0 +1,267 @@
+"""
+Round Archive - Append-only columnar storage for generated rounds
+"""
+import json
+import os
+
+import numpy as np
+
+
+# Column name -> (dtype, values per round); None marks hole columns, which
+# hold one value per hole of the segment's layout
+COLUMNS = {
+    'course_id': (np.int32, 1),
+    'handicap': (np.float32, 1),
+    'course_handicap': (np.int16, 1),
+    'seed': (np.uint64, 1),
+    'golfer_id': (np.uint32, 1),
+    'round_id': (np.uint32, 1),
+    'gross': (np.uint8, None),
+    'net': (np.int8, None)
+}
+
+# Widest supported layout; exports pad hole columns to this many holes
+MAX_HOLES = 27
+
+SEGMENT_PREFIX = "seg_"
+
+
+class RoundArchive:
+    """
+    Append-only store of generated rounds
+    
+    Every append writes one segment: a directory holding one .npy file per
+    column. Segments are never modified, and reads memory-map the files, so
+    scanning the archive only pages in the columns and segments it touches.
+    Course names are stored once in courses.json and referenced by id.
+    Hole columns are as wide as the layout the batch was played on, so
+    segments of 9, 18 and 27-hole courses can sit side by side.
+    
+    The archive supports a single writer at a time.
+    """
+    
+    def __init__(self, directory="round_archive"):
+        """
+        Open or create an archive
+        
+        Args:
+            directory: Directory holding the archive
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.catalog_file = os.path.join(directory, "courses.json")
+        self.course_ids = self.load_catalog()
+    
+    def load_catalog(self):
+        """
+        Load the course name to id mapping
+        
+        Returns:
+            Dictionary of course name -> id
+        """
+        if os.path.exists(self.catalog_file):
+            try:
+                with open(self.catalog_file, 'r') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"Error loading archive catalog: {e}")
+        return {}
+    
+    def course_id(self, course_name):
+        """
+        Get the id of a course, registering it if new
+        
+        Args:
+            course_name: Name of the course
+        
+        Returns:
+            Integer course id
+        """
+        if course_name not in self.course_ids:
+            self.course_ids[course_name] = len(self.course_ids)
+            with open(self.catalog_file, 'w') as f:
+                json.dump(self.course_ids, f, indent=2)
+        return self.course_ids[course_name]
+    
+    def course_name(self, course_id):
+        """
+        Look up a course name by id
+        
+        Args:
+            course_id: Integer course id
+        
+        Returns:
+            Course name or None
+        """
+        for name, cid in self.course_ids.items():
+            if cid == course_id:
+                return name
+        return None
+    
+    def segments(self):
+        """
+        List committed segments in append order
+        
+        Returns:
+            List of segment directory names
+        """
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith(SEGMENT_PREFIX) and not name.endswith('.tmp'))
+    
+    def append(self, course_name, batch, handicap_index, seed=0, golfer_ids=0, round_ids=None):
+        """
+        Append a batch of rounds as a new segment
+        
+        The segment is written to a temporary directory and renamed into
+        place, so readers never see a partial segment.
+        
+        Args:
+            course_name: Name of the course the batch was played on
+            batch: RoundBatch from BatchGenerator.generate
+            handicap_index: Handicap index, scalar or array of shape (n,)
+            seed: Seed of the CounterRNG the batch was drawn with
+            golfer_ids: Golfer id, scalar or array of shape (n,)
+            round_ids: Round ids, defaults to 0..n-1
+        
+        Returns:
+            Name of the new segment
+        
+        Raises:
+            ValueError: If the batch is masked (from RaggedBatchGenerator)
+                or has an unsupported number of holes
+        """
+        if batch.mask is not None:
+            raise ValueError("Masked batches mix courses and hole counts; append each course's "
+                             "rounds from BatchGenerator.generate as its own segment")
+        n = len(batch)
+        n_holes = batch.gross.shape[1]
+        if not 1 <= n_holes <= MAX_HOLES:
+            raise ValueError(f"Rounds must have 1 to {MAX_HOLES} holes, got {n_holes}")
+        if round_ids is None:
+            round_ids = np.arange(n)
+        columns = {
+            'course_id': np.full(n, self.course_id(course_name)),
+            'handicap': np.broadcast_to(handicap_index, (n,)),
+            'course_handicap': batch.course_handicap,
+            'seed': np.full(n, seed),
+            'golfer_id': np.broadcast_to(golfer_ids, (n,)),
+            'round_id': np.broadcast_to(round_ids, (n,)),
+            'gross': batch.gross,
+            'net': batch.net
+        }
+        
+        existing = self.segments()
+        number = int(existing[-1][len(SEGMENT_PREFIX):]) + 1 if existing else 0
+        name = f"{SEGMENT_PREFIX}{number:06d}"
+        staging = os.path.join(self.directory, name + '.tmp')
+        os.makedirs(staging)
+        for column, (dtype, _) in COLUMNS.items():
+            np.save(os.path.join(staging, column + '.npy'),
+                    np.ascontiguousarray(columns[column], dtype=dtype))
+        os.rename(staging, os.path.join(self.directory, name))
+        return name
+    
+    def read_segment(self, segment, columns=None):
+        """
+        Memory-map the columns of one segment
+        
+        Args:
+            segment: Segment directory name
+            columns: Column names to map, defaults to all
+        
+        Returns:
+            Dictionary of column name -> read-only memory-mapped array
+        """
+        path = os.path.join(self.directory, segment)
+        return {column: np.load(os.path.join(path, column + '.npy'), mmap_mode='r')
+                for column in (columns or COLUMNS)}
+    
+    def segment_holes(self, segment):
+        """
+        Number of holes per round in a segment
+        
+        Args:
+            segment: Segment directory name
+        
+        Returns:
+            Width of the segment's hole columns
+        """
+        return self.read_segment(segment, ['gross'])['gross'].shape[1]
+    
+    def scan(self, columns=None):
+        """
+        Iterate over all segments
+        
+        Args:
+            columns: Column names to map, defaults to all
+        
+        Yields:
+            Dictionary of memory-mapped column arrays for each segment
+        """
+        for segment in self.segments():
+            yield self.read_segment(segment, columns)
+    
+    def __len__(self):
+        return sum(len(seg['course_id']) for seg in self.scan(['course_id']))
+    
+    def export_arrow(self, filename, parquet=False):
+        """
+        Export the archive to an Arrow IPC or Parquet file
+        
+        Hole columns are flattened to gross_1..gross_27 and net_1..net_27,
+        with an n_holes column giving each round's layout; holes past it
+        are null. Segments are written one record batch at a time.
+        Requires pyarrow.
+        
+        Args:
+            filename: Output file
+            parquet: Write Parquet instead of Arrow IPC
+        
+        Returns:
+            Number of rounds exported
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow is required for Arrow/Parquet export")
+        
+        fields = []
+        for column, (dtype, width) in COLUMNS.items():
+            arrow_type = pa.from_numpy_dtype(np.dtype(dtype))
+            if width == 1:
+                fields.append(pa.field(column, arrow_type))
+            else:
+                fields.extend(pa.field(f"{column}_{i}", arrow_type)
+                              for i in range(1, MAX_HOLES + 1))
+        fields.append(pa.field('n_holes', pa.uint8()))
+        schema = pa.schema(fields)
+        
+        if parquet:
+            writer = pq.ParquetWriter(filename, schema)
+        else:
+            writer = pa.ipc.new_file(filename, schema)
+        
+        exported = 0
+        with writer:
+            for seg in self.scan():
+                n = len(seg['course_id'])
+                n_holes = seg['gross'].shape[1]
+                arrays = []
+                for column, (dtype, width) in COLUMNS.items():
+                    values = np.asarray(seg[column])
+                    if width == 1:
+                        arrays.append(pa.array(values))
+                    else:
+                        arrow_type = pa.from_numpy_dtype(np.dtype(dtype))
+                        arrays.extend(pa.array(values[:, i]) for i in range(n_holes))
+                        arrays.extend(pa.nulls(n, arrow_type)
+                                      for _ in range(n_holes, MAX_HOLES))
+                arrays.append(pa.array(np.full(n, n_holes, dtype=np.uint8)))
+                record_batch = pa.record_batch(arrays, schema=schema)
+                if parquet:
+                    writer.write_table(pa.Table.from_batches([record_batch]))
+                else:
+                    writer.write_batch(record_batch)
+                exported += record_batch.num_rows
+        return exported
@@ -0,0 +1,182 @@
+"""
+Round Codec - Hole scores packed two to a byte for long-term storage
+"""
+import sys
+import time
+
+import numpy as np
+
+from batch_generator import RoundBatch, allocate_strokes
+
+
+# Score model rounds stay within par - 1 .. par + 6; a nibble stores the
+# score relative to par - 1, leaving room up to par + 14. Scores outside
+# that range (a shot-simulated albatross, say) are rejected, never clamped
+MIN_RELATIVE = -1
+MAX_RELATIVE = MIN_RELATIVE + 15
+
+# Rows decoded per pass, small enough for the intermediates to stay in cache
+DECODE_CHUNK = 1 << 15
+
+BENCHMARK_ROUNDS = 4_000_000
+
+
+def packed_width(n_holes):
+    """Bytes per round for a course of n_holes"""
+    return (n_holes + 1) // 2
+
+
+def encode_scores(gross, par_values):
+    """
+    Pack hole scores two to a byte
+    
+    Hole 2k goes in the high nibble of byte k and hole 2k + 1 in the low
+    nibble; an odd last hole leaves the final low nibble zero. An 18-hole
+    round takes 9 bytes. Strokes received are not stored, as they follow
+    from the course and the course handicap.
+    
+    Args:
+        gross: Gross hole scores, shape (n, n_holes)
+        par_values: Par values, shape (n_holes,)
+    
+    Returns:
+        Uint8 array of shape (n, packed_width(n_holes))
+    
+    Raises:
+        ValueError: If a score is outside par - 1 .. par + 14
+    """
+    gross = np.asarray(gross)
+    relative = gross - (np.asarray(par_values, dtype=np.int16) + MIN_RELATIVE)
+    outside = (relative < 0) | (relative > 15)
+    if outside.any():
+        rows, holes = np.nonzero(outside)
+        raise ValueError(f"{len(rows)} hole scores outside par - {-MIN_RELATIVE} .. "
+                         f"par + {MAX_RELATIVE}, first {gross[rows[0], holes[0]]} on hole "
+                         f"{holes[0] + 1} of round {rows[0]}; these rounds cannot be packed")
+    
+    n, n_holes = gross.shape
+    nibbles = np.zeros((n, 2 * packed_width(n_holes)), dtype=np.uint8)
+    nibbles[:, :n_holes] = relative
+    return (nibbles[:, 0::2] << 4) | nibbles[:, 1::2]
+
+
+def decode_table(par_values):
+    """
+    Build the decode lookup table of a course
+    
+    Every (byte position, byte value) maps to the two gross scores it holds,
+    with par already added, stored as one uint16 whose bytes are the two
+    scores in hole order. Position k's 256 entries start at 256 * k.
+    
+    Args:
+        par_values: Par values, shape (n_holes,)
+    
+    Returns:
+        Tuple of (flat uint16 table, uint16 offset of each byte position)
+    """
+    par_values = np.asarray(par_values, dtype=np.int16)
+    width = packed_width(len(par_values))
+    base = np.full(2 * width, -MIN_RELATIVE, dtype=np.int16)
+    base[:len(par_values)] = par_values
+    base = (base + MIN_RELATIVE).astype(np.uint8).reshape(width, 1, 2)
+    
+    values = np.arange(256, dtype=np.uint8)
+    pairs = np.stack([values >> 4, values & 15], axis=1)
+    scores = np.ascontiguousarray(pairs[np.newaxis] + base)
+    return scores.view(np.uint16).ravel(), (256 * np.arange(width)).astype(np.uint16)
+
+
+def decode_scores(packed, par_values, chunk=DECODE_CHUNK):
+    """
+    Unpack hole scores
+    
+    Args:
+        packed: Uint8 array from encode_scores, shape (n, packed_width)
+        par_values: Par values, shape (n_holes,)
+        chunk: Rows decoded per pass
+    
+    Returns:
+        Uint8 array of gross scores, shape (n, n_holes)
+    """
+    packed = np.asarray(packed, dtype=np.uint8)
+    table, offsets = decode_table(par_values)
+    n = packed.shape[0]
+    pairs = np.empty((n, len(offsets)), dtype=np.uint16)
+    for start in range(0, n, chunk):
+        stop = start + chunk
+        np.take(table, packed[start:stop] + offsets, out=pairs[start:stop])
+    return pairs.view(np.uint8)[:, :len(par_values)]
+
+
+def decode_batch(packed, par_values, hole_handicaps, course_handicap):
+    """
+    Unpack rounds into a RoundBatch, deriving strokes received from the course
+    
+    Args:
+        packed: Uint8 array from encode_scores
+        par_values: Par values, shape (n_holes,)
+        hole_handicaps: Hole handicap indexes, shape (n_holes,)
+        course_handicap: Course handicap of each round, shape (n,)
+    
+    Returns:
+        RoundBatch
+    """
+    gross = decode_scores(packed, par_values).astype(np.int16)
+    course_handicap = np.asarray(course_handicap, dtype=np.int16)
+    return RoundBatch(gross, allocate_strokes(course_handicap, hole_handicaps),
+                      par_values, course_handicap)
+
+
+def benchmark(n_rounds=BENCHMARK_ROUNDS, seed=0):
+    """
+    Time encoding and decoding of random 18-hole rounds
+    
+    Args:
+        n_rounds: Number of rounds
+        seed: Seed of the random scores
+    
+    Returns:
+        Dictionary with 'encode' and 'decode' seconds, 'packed_mb' and
+        'decoded_mb' sizes, and decode throughput in MB/s of packed input
+        ('decode_in_mbs') and of scores out ('decode_out_mbs')
+    """
+    rng = np.random.default_rng(seed)
+    par = np.array([4, 4, 3, 5, 4, 4, 3, 4, 5] * 2, dtype=np.int16)
+    gross = (par + rng.integers(MIN_RELATIVE, 7, (n_rounds, len(par)))).astype(np.uint8)
+    
+    started = time.perf_counter()
+    packed = encode_scores(gross, par)
+    encoded = time.perf_counter()
+    decoded = decode_scores(packed, par)
+    finished = time.perf_counter()
+    if not np.array_equal(decoded, gross):
+        raise RuntimeError("Decoded scores differ from the encoded ones")
+    
+    decode_seconds = finished - encoded
+    return {
+        'encode': encoded - started,
+        'decode': decode_seconds,
+        'packed_mb': packed.nbytes / 1e6,
+        'decoded_mb': decoded.nbytes / 1e6,
+        'decode_in_mbs': packed.nbytes / 1e6 / decode_seconds,
+        'decode_out_mbs': decoded.nbytes / 1e6 / decode_seconds
+    }
+
+
+def main():
+    """
+    Command line entry point:
+    round_codec.py [N_ROUNDS]
+    """
+    n_rounds = int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_ROUNDS
+    result = benchmark(n_rounds)
+    print(f"{n_rounds:,} rounds: {result['decoded_mb']:.1f} MB of scores packed "
+          f"into {result['packed_mb']:.1f} MB")
+    print(f"Encode: {result['encode']:.3f} s")
+    print(f"Decode: {result['decode']:.3f} s, {result['decode_in_mbs']:.0f} MB/s packed in, "
+          f"{result['decode_out_mbs']:.0f} MB/s scores out")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+"""
+Round Query - Fast statistics over archived rounds
+"""
+import os
+import pickle
+
+import numpy as np
+
+from hole_model import STANDARD_HOLES
+from round_archive import RoundArchive
+
+
+# Handicap indexes covered by the aggregates, in WHS steps of 0.1
+MIN_HANDICAP_INDEX = -5.0
+MAX_HANDICAP_INDEX = 54.0
+INDEX_STEP = 0.1
+N_INDEX_SLOTS = int(round((MAX_HANDICAP_INDEX - MIN_HANDICAP_INDEX) / INDEX_STEP)) + 1
+
+# Bump when the saved aggregates change layout, so they are rebuilt
+AGGREGATES_VERSION = 3
+
+# Hole score histogram covers scores 0..HISTOGRAM_BINS-1
+HISTOGRAM_BINS = 20
+
+AGGREGATES_FILE = "aggregates.pkl"
+
+
+def index_slots(handicap_index):
+    """
+    Aggregate slot of each handicap index
+    
+    Args:
+        handicap_index: Handicap index, scalar or array
+    
+    Returns:
+        Integer slot(s); out-of-range indexes fall outside 0..N_INDEX_SLOTS-1
+    """
+    index = np.asarray(handicap_index, dtype=float)
+    return np.round((index - MIN_HANDICAP_INDEX) / INDEX_STEP).astype(np.int64)
+
+
+def slot_indexes():
+    """Handicap index of every aggregate slot"""
+    return np.round(MIN_HANDICAP_INDEX + INDEX_STEP * np.arange(N_INDEX_SLOTS), 1)
+
+
+class CourseAggregates:
+    """Per-hole running aggregates for one course, by handicap index"""
+    
+    def __init__(self, n_holes=18):
+        """
+        Initialize empty aggregates
+        
+        Args:
+            n_holes: Holes per round
+        """
+        shape = (N_INDEX_SLOTS, n_holes)
+        self.rounds = np.zeros(N_INDEX_SLOTS, dtype=np.int64)
+        self.sums = {m: np.zeros(shape) for m in ('gross', 'net')}
+        self.squares = {m: np.zeros(shape) for m in ('gross', 'net')}
+        self.total_sums = {m: np.zeros(N_INDEX_SLOTS) for m in ('gross', 'net')}
+        self.total_squares = {m: np.zeros(N_INDEX_SLOTS) for m in ('gross', 'net')}
+        self.histograms = {m: np.zeros(shape + (HISTOGRAM_BINS,), dtype=np.int32)
+                           for m in ('gross', 'net')}
+    
+    def add(self, slot, scores):
+        """
+        Add rounds to the aggregates
+        
+        Args:
+            slot: Handicap index slot of each round, shape (n,)
+            scores: Dictionary with 'gross' and 'net' arrays of shape (n, n_holes)
+        """
+        n_holes = scores['gross'].shape[1]
+        self.rounds += np.bincount(slot, minlength=N_INDEX_SLOTS)
+        cell = (slot[:, np.newaxis] * n_holes + np.arange(n_holes)).ravel()
+        n_cells = N_INDEX_SLOTS * n_holes
+        for metric in ('gross', 'net'):
+            values = np.asarray(scores[metric], dtype=np.int64)
+            flat = values.ravel().astype(float)
+            self.sums[metric] += np.bincount(cell, flat, n_cells).reshape(-1, n_holes)
+            self.squares[metric] += np.bincount(cell, flat ** 2, n_cells).reshape(-1, n_holes)
+            
+            totals = values.sum(axis=1).astype(float)
+            self.total_sums[metric] += np.bincount(slot, totals, N_INDEX_SLOTS)
+            self.total_squares[metric] += np.bincount(slot, totals ** 2, N_INDEX_SLOTS)
+            
+            bins = np.clip(values.ravel(), 0, HISTOGRAM_BINS - 1)
+            counts = np.bincount(cell * HISTOGRAM_BINS + bins,
+                                 minlength=n_cells * HISTOGRAM_BINS)
+            self.histograms[metric] += counts.reshape(self.histograms[metric].shape)
+
+
+def summarize(count, total, squares, histogram=None):
+    """
+    Turn running sums into summary statistics
+    
+    Args:
+        count: Number of values
+        total: Sum of values
+        squares: Sum of squared values
+        histogram: Optional histogram of values
+    
+    Returns:
+        Dictionary with count, mean, std and (optionally) histogram
+    """
+    result = {'count': int(count), 'mean': None, 'std': None}
+    if count:
+        mean = total / count
+        result['mean'] = float(mean)
+        result['std'] = float(np.sqrt(max(squares / count - mean ** 2, 0.0)))
+    if histogram is not None:
+        result['histogram'] = histogram.tolist()
+    return result
+
+
+class RoundQueryEngine:
+    """
+    Answers scoring questions about a RoundArchive without rescanning it
+    
+    For every course the engine keeps per-hole sums, sums of squares and
+    score histograms for each handicap index (in steps of 0.1, from the
+    archived handicap column), plus an index of which segments hold
+    rounds for each (course, course handicap). Index range queries are
+    exact; course handicap queries cover the indexes that give that
+    course handicap at the course's current slope. Aggregates are kept
+    separately for each layout width a course was played at, and queries
+    use the course's current width. Aggregates are
+    updated as segments are appended and saved inside the archive
+    directory, so only new segments are ever read.
+    """
+    
+    def __init__(self, archive, course_manager=None):
+        """
+        Initialize a query engine
+        
+        Args:
+            archive: RoundArchive, or an archive directory name
+            course_manager: Optional CourseManager, needed to translate
+                course handicaps into handicap indexes
+        """
+        if not isinstance(archive, RoundArchive):
+            archive = RoundArchive(archive)
+        self.archive = archive
+        self.course_manager = course_manager
+        self.aggregates = {}
+        self.segment_index = {}
+        self.processed = set()
+        self.load()
+        self.refresh()
+    
+    def aggregates_file(self):
+        """Path of the saved aggregates inside the archive directory"""
+        return os.path.join(self.archive.directory, AGGREGATES_FILE)
+    
+    def load(self):
+        """Load saved aggregates, if any"""
+        filename = self.aggregates_file()
+        if not os.path.exists(filename):
+            return
+        try:
+            with open(filename, 'rb') as f:
+                state = pickle.load(f)
+            if state.get('version') != AGGREGATES_VERSION:
+                print("Query aggregates are out of date, rebuilding")
+                return
+            self.aggregates = state['aggregates']
+            self.segment_index = state['segment_index']
+            self.processed = set(state['processed'])
+        except Exception as e:
+            print(f"Error loading query aggregates, rebuilding: {e}")
+            self.aggregates, self.segment_index, self.processed = {}, {}, set()
+    
+    def save(self):
+        """Save aggregates next to the archive segments"""
+        state = {
+            'version': AGGREGATES_VERSION,
+            'aggregates': self.aggregates,
+            'segment_index': self.segment_index,
+            'processed': sorted(self.processed)
+        }
+        try:
+            with open(self.aggregates_file(), 'wb') as f:
+                pickle.dump(state, f)
+        except Exception as e:
+            print(f"Error saving query aggregates: {e}")
+    
+    def ingest(self, segment):
+        """
+        Add one archive segment to the aggregates and index
+        
+        Args:
+            segment: Segment directory name
+        """
+        columns = self.archive.read_segment(
+            segment, ['course_id', 'handicap', 'course_handicap', 'gross', 'net'])
+        course_ids = np.asarray(columns['course_id'])
+        course_handicap = np.asarray(columns['course_handicap'])
+        slots = index_slots(columns['handicap'])
+        in_range = (slots >= 0) & (slots < N_INDEX_SLOTS)
+        if not in_range.all():
+            print(f"Skipping rounds outside handicap index range in {segment}")
+        
+        for course_id in np.unique(course_ids):
+            rows = (course_ids == course_id) & in_range
+            scores = {'gross': columns['gross'][rows], 'net': columns['net'][rows]}
+            course_id = int(course_id)
+            key = (course_id, scores['gross'].shape[1])
+            if key not in self.aggregates:
+                self.aggregates[key] = CourseAggregates(key[1])
+            self.aggregates[key].add(slots[rows], scores)
+            
+            for handicap in np.unique(course_handicap[rows]):
+                key = (course_id, int(handicap))
+                self.segment_index.setdefault(key, []).append(segment)
+        self.processed.add(segment)
+    
+    def refresh(self):
+        """
+        Ingest segments appended since the last refresh
+        
+        Returns:
+            Number of new segments ingested
+        """
+        new_segments = [s for s in self.archive.segments() if s not in self.processed]
+        for segment in new_segments:
+            self.ingest(segment)
+        if new_segments:
+            self.save()
+        return len(new_segments)
+    
+    def append(self, course_name, batch, handicap_index, **kwargs):
+        """
+        Append a batch to the archive and update the aggregates
+        
+        Args:
+            course_name: Name of the course the batch was played on
+            batch: RoundBatch from BatchGenerator.generate
+            handicap_index: Handicap index, scalar or array
+            **kwargs: Passed to RoundArchive.append
+        
+        Returns:
+            Name of the new segment
+        """
+        segment = self.archive.append(course_name, batch, handicap_index, **kwargs)
+        self.refresh()
+        return segment
+    
+    def query_slots(self, course_name, index_range=None, course_handicaps=None):
+        """
+        Resolve the handicap index slots a query covers
+        
+        Args:
+            course_name: Name of the course
+            index_range: Optional (low, high) handicap index range, inclusive
+            course_handicaps: Optional explicit list of course handicaps
+        
+        Returns:
+            Array of handicap index slots
+        """
+        slots = np.arange(N_INDEX_SLOTS)
+        if course_handicaps is not None:
+            if self.course_manager is None:
+                raise ValueError("A course manager is needed to query by course handicap")
+            course_data = self.course_manager.get_course(course_name)
+            if not course_data:
+                raise ValueError(f"Course not found: {course_name}")
+            slope = course_data['slope_rating']
+            scale = len(course_data['par_values']) / STANDARD_HOLES
+            handicaps = np.round(slot_indexes() * slope / 113 * scale)
+            slots = slots[np.isin(handicaps, course_handicaps)]
+        if index_range is not None:
+            low, high = index_slots(index_range)
+            slots = slots[(slots >= low) & (slots <= high)]
+        return slots
+    
+    def course_aggregates(self, course_name):
+        """
+        Get the aggregates of a course
+        
+        A course whose layout changed has aggregates for each width. The
+        current width comes from the course manager; without one, the
+        width with the most rounds is used.
+        
+        Args:
+            course_name: Name of the course
+        
+        Returns:
+            CourseAggregates or None if no rounds are stored
+        """
+        course_id = self.archive.course_ids.get(course_name)
+        by_width = {width: agg for (cid, width), agg in self.aggregates.items()
+                    if cid == course_id}
+        if not by_width:
+            return None
+        course_data = self.course_manager.get_course(course_name) if self.course_manager else None
+        if course_data:
+            return by_width.get(len(course_data['par_values']))
+        return max(by_width.values(), key=lambda agg: agg.rounds.sum())
+    
+    def hole_stats(self, course_name, hole, metric='net', index_range=None,
+                   course_handicaps=None):
+        """
+        Scoring statistics for one hole
+        
+        Example: hole_stats('Baytree National Golf Links (blue)', 8,
+        index_range=(10, 15)) gives the average net score on hole 8 for
+        ghosts with an index from 10 to 15.
+        
+        Args:
+            course_name: Name of the course
+            hole: Hole number (1-based)
+            metric: 'gross' or 'net'
+            index_range: Optional (low, high) handicap index range
+            course_handicaps: Optional explicit list of course handicaps
+        
+        Returns:
+            Dictionary with count, mean, std and score histogram
+        """
+        agg = self.course_aggregates(course_name)
+        if agg is None:
+            return summarize(0, 0.0, 0.0)
+        if not 1 <= hole <= agg.sums[metric].shape[1]:
+            raise ValueError(f"Hole {hole} is not on the {agg.sums[metric].shape[1]}-hole layout")
+        slots = self.query_slots(course_name, index_range, course_handicaps)
+        h = hole - 1
+        return summarize(
+            agg.rounds[slots].sum(),
+            agg.sums[metric][slots, h].sum(),
+            agg.squares[metric][slots, h].sum(),
+            agg.histograms[metric][slots, h].sum(axis=0)
+        )
+    
+    def round_stats(self, course_name, metric='net', index_range=None,
+                    course_handicaps=None):
+        """
+        Statistics of total scores plus the per-hole averages
+        
+        Args:
+            course_name: Name of the course
+            metric: 'gross' or 'net'
+            index_range: Optional (low, high) handicap index range
+            course_handicaps: Optional explicit list of course handicaps
+        
+        Returns:
+            Dictionary with count, mean, std and 'hole_means'
+        """
+        agg = self.course_aggregates(course_name)
+        if agg is None:
+            return summarize(0, 0.0, 0.0)
+        slots = self.query_slots(course_name, index_range, course_handicaps)
+        count = agg.rounds[slots].sum()
+        result = summarize(count, agg.total_sums[metric][slots].sum(),
+                           agg.total_squares[metric][slots].sum())
+        if count:
+            result['hole_means'] = (agg.sums[metric][slots].sum(axis=0) / count).tolist()
+        return result
+    
+    def segments_for(self, course_name, course_handicap):
+        """
+        List the segments holding rounds for a course and course handicap
+        
+        Args:
+            course_name: Name of the course
+            course_handicap: Course handicap
+        
+        Returns:
+            List of segment names
+        """
+        course_id = self.archive.course_ids.get(course_name)
+        return list(self.segment_index.get((course_id, course_handicap), []))
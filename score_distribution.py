@@ -0,0 +1,110 @@
+"""
+Score Distribution - Expected scores and scoring rates for a ghost on a course
+"""
+import threading
+
+import numpy as np
+
+from result_cache import GenerationCache
+
+
+# Rounds simulated per (course, course handicap, score bracket)
+DISTRIBUTION_SAMPLES = 20000
+
+PERCENTILES = (10, 50, 90)
+
+
+def summarize_batch(batch):
+    """
+    Summarize the score distribution of a batch of rounds
+    
+    Args:
+        batch: RoundBatch
+    
+    Returns:
+        Dictionary with 'gross' and 'net' (mean, standard deviation and
+        percentiles of the round totals), 'hole_means' (average gross per
+        hole), 'rates' (share of holes scored birdie or better, par, bogey,
+        double bogey or worse) and 'hole_rates' (birdie and bogey rates per
+        hole)
+    """
+    played = np.ones(batch.gross.shape, dtype=bool) if batch.mask is None else batch.mask
+    to_par = batch.gross - batch.par
+    outcomes = {
+        'birdie': played & (to_par <= -1),
+        'par': played & (to_par == 0),
+        'bogey': played & (to_par == 1),
+        'double': played & (to_par >= 2)
+    }
+    holes = played.sum(axis=0)
+    
+    summary = {'rounds': len(batch)}
+    for metric, totals in (('gross', batch.gross_totals()), ('net', batch.net_totals())):
+        stats = {'mean': float(totals.mean()), 'std': float(totals.std())}
+        for p, value in zip(PERCENTILES, np.percentile(totals, PERCENTILES)):
+            stats[f'p{p}'] = float(value)
+        summary[metric] = stats
+    summary['hole_means'] = (batch.gross.sum(axis=0) / np.maximum(holes, 1)).tolist()
+    summary['rates'] = {name: float(hit.sum() / played.sum()) for name, hit in outcomes.items()}
+    summary['hole_rates'] = {name: (outcomes[name].sum(axis=0) / np.maximum(holes, 1)).tolist()
+                             for name in ('birdie', 'bogey')}
+    return summary
+
+
+class ScoreDistributions:
+    """
+    Score distribution summaries, computed once per generation cache key
+    
+    Batches come from a GenerationCache, so summaries share its keys (one
+    per course handicap and score bracket of the course): a
+    course edit or a new score model gives new keys rather than stale
+    results. Summaries are small and kept for the life of the object.
+    Safe to call from a background thread.
+    """
+    
+    def __init__(self, generation_cache=None, n_samples=DISTRIBUTION_SAMPLES):
+        """
+        Initialize the summaries
+        
+        Args:
+            generation_cache: Optional GenerationCache to draw batches from
+            n_samples: Rounds simulated per summary
+        """
+        self.generation_cache = generation_cache or GenerationCache()
+        self.n_samples = n_samples
+        self.summaries = {}
+        self.lock = threading.Lock()
+    
+    def cached(self, course_data, handicap_index):
+        """
+        Look up a summary without computing it
+        
+        Args:
+            course_data: Course data dictionary
+            handicap_index: Handicap index of the ghost
+        
+        Returns:
+            Summary dictionary or None
+        """
+        key = self.generation_cache.make_key(course_data, handicap_index, self.n_samples)
+        return self.summaries.get(key)
+    
+    def summary(self, course_data, handicap_index, hole_model=None):
+        """
+        Get the summary for a course and handicap index, simulating on a miss
+        
+        Args:
+            course_data: Course data dictionary
+            handicap_index: Handicap index of the ghost
+            hole_model: Optional cached HoleModel for the course
+        
+        Returns:
+            Summary dictionary, see summarize_batch
+        """
+        key = self.generation_cache.make_key(course_data, handicap_index, self.n_samples)
+        with self.lock:
+            if key not in self.summaries:
+                batch = self.generation_cache.get_or_generate(
+                    course_data, handicap_index, self.n_samples, hole_model)
+                self.summaries[key] = summarize_batch(batch)
+            return self.summaries[key]
@@ -0,0 +1,184 @@
+"""
+Score Model - Noise and difficulty parameters for ghost score generation
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+# Bump when the score generation model changes in a way that alters results
+MODEL_VERSION = 1
+
+# Parameters of the original hand-tuned model
+DEFAULT_PARAMS = {
+    'round_sigma': 1.2,
+    'hole_sigma': 1.1,
+    'hard_factor': 0.3,
+    'medium_factor': 0.0,
+    'easy_factor': -0.2
+}
+
+PARAM_NAMES = list(DEFAULT_PARAMS.keys())
+
+# Lower bound of each handicap index bracket
+HANDICAP_BRACKETS = [0.0, 5.0, 10.0, 15.0, 20.0, 28.0]
+
+
+def difficulty_bucket(hole_handicaps):
+    """
+    Classify holes into difficulty buckets
+    
+    Args:
+        hole_handicaps: Hole handicap indexes, any shape
+    
+    Returns:
+        Array of bucket numbers: 0 hard (1-6), 1 medium, 2 easy (13-18)
+    """
+    hole_handicaps = np.asarray(hole_handicaps)
+    return np.where(hole_handicaps <= 6, 0, np.where(hole_handicaps >= 13, 2, 1))
+
+
+class ScoreModel:
+    """Score model parameters for each handicap index bracket"""
+    
+    def __init__(self, brackets=None, yardage_adjusted=True):
+        """
+        Initialize a score model
+        
+        Args:
+            brackets: List of parameter dictionaries, one per entry of
+                HANDICAP_BRACKETS. Defaults to DEFAULT_PARAMS everywhere.
+            yardage_adjusted: Whether hole_sigma excludes the effect of hole
+                length, so HoleModel should add it from yardages. False for
+                models calibrated from rounds without yardages.
+        """
+        if brackets is None:
+            brackets = [dict(DEFAULT_PARAMS) for _ in HANDICAP_BRACKETS]
+        self.brackets = brackets
+        self.yardage_adjusted = yardage_adjusted
+        self.table = np.array([[b[name] for name in PARAM_NAMES] for b in brackets])
+    
+    @classmethod
+    def load(cls, filename):
+        """
+        Load fitted parameters from a JSON file
+        
+        Args:
+            filename: JSON file written by ScoreModel.save
+        
+        Returns:
+            ScoreModel instance (defaults if the file does not exist)
+        """
+        if os.path.exists(filename):
+            try:
+                with open(filename, 'r') as f:
+                    data = json.load(f)
+                brackets = []
+                for fitted in data['brackets']:
+                    params = dict(DEFAULT_PARAMS)
+                    params.update({k: fitted[k] for k in PARAM_NAMES if k in fitted})
+                    brackets.append(params)
+                if len(brackets) == len(HANDICAP_BRACKETS):
+                    return cls(brackets, data.get('yardage_adjusted', False))
+                print(f"Ignoring model parameters in {filename}: bracket mismatch")
+            except Exception as e:
+                print(f"Error loading model parameters: {e}")
+        return cls()
+    
+    def save(self, filename, counts=None):
+        """
+        Save parameters to a JSON file
+        
+        Args:
+            filename: JSON file to write
+            counts: Optional number of rounds fitted per bracket
+        
+        Returns:
+            True if saved successfully
+        """
+        brackets = []
+        for i, (lower, params) in enumerate(zip(HANDICAP_BRACKETS, self.brackets)):
+            entry = {'min_index': lower}
+            entry.update({k: round(float(params[k]), 4) for k in PARAM_NAMES})
+            if counts is not None:
+                entry['rounds'] = int(counts[i])
+            brackets.append(entry)
+        try:
+            with open(filename, 'w') as f:
+                json.dump({'yardage_adjusted': self.yardage_adjusted,
+                           'brackets': brackets}, f, indent=2)
+            _models.pop(filename, None)
+            return True
+        except Exception as e:
+            print(f"Error saving model parameters: {e}")
+            return False
+    
+    def fingerprint(self):
+        """
+        Identify the model version and parameters
+        
+        Returns:
+            String that changes with MODEL_VERSION, any parameter or
+            yardage_adjusted
+        """
+        digest = hashlib.sha1(self.table.tobytes()).hexdigest()[:12]
+        suffix = "" if self.yardage_adjusted else "-flat"
+        return f"v{MODEL_VERSION}-{digest}{suffix}"
+    
+    def bracket_of(self, handicap_index):
+        """
+        Find the bracket of each handicap index
+        
+        Args:
+            handicap_index: Handicap index, scalar or array
+        
+        Returns:
+            Bracket number(s)
+        """
+        bracket = np.searchsorted(HANDICAP_BRACKETS, handicap_index, side='right') - 1
+        return np.maximum(bracket, 0)
+    
+    def params_for(self, handicap_index):
+        """
+        Get the parameters for one handicap index
+        
+        Args:
+            handicap_index: Player's handicap index
+        
+        Returns:
+            Dictionary of parameters
+        """
+        return dict(self.brackets[int(self.bracket_of(handicap_index))])
+    
+    def param_arrays(self, handicap_index):
+        """
+        Get the parameters for an array of handicap indexes
+        
+        Args:
+            handicap_index: Array of handicap indexes, shape (n,)
+        
+        Returns:
+            Dictionary of parameter arrays, each of shape (n,)
+        """
+        rows = self.table[self.bracket_of(handicap_index)]
+        return {name: rows[..., i] for i, name in enumerate(PARAM_NAMES)}
+
+
+_models = {}
+
+
+def load_score_model(filename="model_params.json"):
+    """
+    Load the score model, reusing it across generators
+    
+    Args:
+        filename: JSON file of fitted parameters
+    
+    Returns:
+        ScoreModel instance
+    """
+    if filename not in _models:
+        _models[filename] = ScoreModel.load(filename)
+    return _models[filename]
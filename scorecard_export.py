@@ -0,0 +1,443 @@
+"""
+Scorecard Export - Bulk CSV, PDF and PNG scorecards for generated rounds
+"""
+import csv
+import importlib.util
+import os
+import sys
+from itertools import islice
+from multiprocessing import Pool
+
+from batch_generator import BatchGenerator
+from course_manager import CourseManager
+
+
+# Landscape US Letter, in points, with two cards per page
+PAGE_WIDTH = 792
+PAGE_HEIGHT = 612
+PAGE_MARGIN = 36
+CARDS_PER_PAGE = 2
+
+# Scorecard grid, in points
+LABEL_WIDTH = 54
+ROW_HEIGHT = 18
+TITLE_HEIGHT = 42
+
+# PNG cards are drawn at this many pixels per point
+PNG_SCALE = 2
+
+# Cards handed to the process pool at a time; bounds memory for big exports
+RENDER_CHUNK = 64
+
+CSV_FIELDS = ['card', 'name', 'course', 'tee', 'handicap_index', 'course_handicap',
+              'hole', 'yardage', 'par', 'hole_handicap', 'strokes', 'gross', 'net']
+
+
+def nine_labels(n_holes):
+    """
+    Label the subtotal of each nine
+    
+    Args:
+        n_holes: Holes in the round
+    
+    Returns:
+        List of labels, one per nine: OUT/IN for 18 holes, 9-1, 9-2, ...
+        otherwise. A single nine has no subtotal and gets an empty list.
+    """
+    n_nines = n_holes // 9
+    if n_nines == 2:
+        return ['OUT', 'IN']
+    if n_nines < 2:
+        return []
+    return [f"9-{k + 1}" for k in range(n_nines)]
+
+
+def iter_cards(batch, course_name, course_data, handicap_index, names=None, first_card=1):
+    """
+    Turn a batch of rounds into scorecards, one at a time
+    
+    Args:
+        batch: RoundBatch of rounds played on the course
+        course_name: Name of the course
+        course_data: Course data dictionary
+        handicap_index: Handicap index, scalar or sequence, one per round
+        names: Optional sequence of player names, one per round
+        first_card: Number of the first card
+    
+    Yields:
+        Scorecard dictionaries
+    """
+    yardages = course_data.get('yardages') or [0] * len(course_data['par_values'])
+    for i in range(len(batch)):
+        index = handicap_index[i] if hasattr(handicap_index, '__len__') else handicap_index
+        card_number = first_card + i
+        holes = []
+        for score in batch.to_round(i):
+            h = score['hole'] - 1
+            holes.append({
+                'hole': score['hole'],
+                'yardage': int(yardages[h]),
+                'par': score['par'],
+                'hole_handicap': int(course_data['hole_handicaps'][h]),
+                'strokes': score['strokes_received'],
+                'gross': score['gross_score'],
+                'net': score['net_score']
+            })
+        yield {
+            'card': card_number,
+            'name': names[i] if names is not None else f"Ghost {card_number}",
+            'course': course_name,
+            'tee': course_data.get('tee_name', ''),
+            'handicap_index': float(index),
+            'course_handicap': int(batch.course_handicap[i]),
+            'holes': holes
+        }
+
+
+def card_table(card):
+    """
+    Lay out a scorecard as a grid with a subtotal after each nine
+    
+    Args:
+        card: Scorecard dictionary from iter_cards
+    
+    Returns:
+        List of rows, each a list of cell strings starting with the row label
+    """
+    fields = [('HOLE', 'hole'), ('YDS', 'yardage'), ('PAR', 'par'), ('HCP', 'hole_handicap'),
+              ('STR', 'strokes'), ('GROSS', 'gross'), ('NET', 'net')]
+    totals = ('yardage', 'par', 'strokes', 'gross', 'net')
+    labels = nine_labels(len(card['holes']))
+    rows = [[label] for label, _ in fields]
+    
+    def add_total(label, holes):
+        for row, (_, key) in zip(rows, fields):
+            if key == 'hole':
+                row.append(label)
+            elif key in totals:
+                row.append(str(sum(h[key] for h in holes)))
+            else:
+                row.append('')
+    
+    for h, hole in enumerate(card['holes']):
+        for row, (_, key) in zip(rows, fields):
+            value = hole[key]
+            row.append(str(value) if value or key in ('gross', 'net') else '')
+        if labels and (h + 1) % 9 == 0:
+            add_total(labels[h // 9], card['holes'][h - 8:h + 1])
+    add_total('TOT', card['holes'])
+    return rows
+
+
+def card_title(card):
+    """Heading line of a scorecard"""
+    return (f"#{card['card']}  {card['name']}  -  {card['course']}"
+            f"  |  Index {card['handicap_index']:.1f}  CH {card['course_handicap']}")
+
+
+def pdf_text(text):
+    """Escape text for a PDF string literal"""
+    text = str(text).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def render_card_pdf(card, top):
+    """
+    Draw one scorecard as PDF page content
+    
+    Args:
+        card: Scorecard dictionary from iter_cards
+        top: Y coordinate of the card's top edge, in points
+    
+    Returns:
+        Content stream operators as bytes
+    """
+    rows = card_table(card)
+    n_columns = len(rows[0]) - 1
+    column_width = (PAGE_WIDTH - 2 * PAGE_MARGIN - LABEL_WIDTH) / n_columns
+    left = PAGE_MARGIN
+    ops = [f"BT /F2 12 Tf {left} {top - 16} Td ({pdf_text(card_title(card))}) Tj ET"]
+    
+    grid_top = top - TITLE_HEIGHT + 12
+    grid_width = LABEL_WIDTH + n_columns * column_width
+    grid_height = len(rows) * ROW_HEIGHT
+    ops.append("0.5 w")
+    for r in range(len(rows) + 1):
+        y = grid_top - r * ROW_HEIGHT
+        ops.append(f"{left} {y} m {left + grid_width:.2f} {y} l S")
+    for c in range(n_columns + 1):
+        x = left + LABEL_WIDTH + c * column_width
+        ops.append(f"{x:.2f} {grid_top} m {x:.2f} {grid_top - grid_height} l S")
+    ops.append(f"{left} {grid_top} m {left} {grid_top - grid_height} l S")
+    
+    for r, row in enumerate(rows):
+        y = grid_top - (r + 1) * ROW_HEIGHT + 5
+        bold = r == 0 or row[0] in ('GROSS', 'NET')
+        ops.append(f"BT /F2 8 Tf {left + 4} {y} Td ({row[0]}) Tj ET")
+        font = '/F2' if bold else '/F1'
+        for c, cell in enumerate(row[1:]):
+            if not cell:
+                continue
+            # Centre using an average Helvetica digit width
+            x = left + LABEL_WIDTH + (c + 0.5) * column_width - len(cell) * 2.2
+            ops.append(f"BT {font} 8 Tf {x:.2f} {y} Td ({pdf_text(cell)}) Tj ET")
+    return "\n".join(ops).encode('latin-1')
+
+
+def render_page_pdf(cards):
+    """Draw the cards of one page, top to bottom"""
+    slot_height = (PAGE_HEIGHT - 2 * PAGE_MARGIN) / CARDS_PER_PAGE
+    return b"\n".join(render_card_pdf(card, PAGE_HEIGHT - PAGE_MARGIN - i * slot_height)
+                      for i, card in enumerate(cards))
+
+
+class PdfWriter:
+    """
+    Minimal streaming PDF writer
+    
+    Pages are written as soon as they are added; only the object offsets
+    are kept until close() writes the page tree and cross-reference table.
+    Uses the standard Helvetica fonts, so nothing is embedded.
+    """
+    
+    # Fixed object numbers; pages are numbered from FIRST_PAGE_OBJECT
+    CATALOG = 1
+    PAGES = 2
+    FONT = 3
+    BOLD_FONT = 4
+    FIRST_PAGE_OBJECT = 5
+    
+    def __init__(self, filename):
+        """
+        Start a PDF file
+        
+        Args:
+            filename: Output file
+        """
+        self.file = open(filename, 'wb')
+        self.offsets = {}
+        self.page_objects = []
+        self.next_object = self.FIRST_PAGE_OBJECT
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self.write_object(self.FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        self.write_object(self.BOLD_FONT,
+                          b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+    
+    def write_object(self, number, body):
+        """Write one indirect object"""
+        self.offsets[number] = self.file.tell()
+        self.file.write(f"{number} 0 obj\n".encode('latin-1') + body + b"\nendobj\n")
+    
+    def add_page(self, content):
+        """
+        Append a page
+        
+        Args:
+            content: Page content stream operators as bytes
+        """
+        content_object, page_object = self.next_object, self.next_object + 1
+        self.next_object += 2
+        self.write_object(content_object,
+                          f"<< /Length {len(content)} >>\nstream\n".encode('latin-1')
+                          + content + b"\nendstream")
+        self.write_object(page_object, (
+            f"<< /Type /Page /Parent {self.PAGES} 0 R "
+            f"/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {self.FONT} 0 R /F2 {self.BOLD_FONT} 0 R >> >> "
+            f"/Contents {content_object} 0 R >>").encode('latin-1'))
+        self.page_objects.append(page_object)
+    
+    def close(self):
+        """Write the page tree, cross-reference table and trailer"""
+        kids = " ".join(f"{n} 0 R" for n in self.page_objects)
+        self.write_object(self.PAGES, (
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_objects)} >>"
+        ).encode('latin-1'))
+        self.write_object(self.CATALOG,
+                          f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode('latin-1'))
+        
+        xref_offset = self.file.tell()
+        n_objects = self.next_object
+        lines = [f"xref\n0 {n_objects}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{self.offsets[n]:010d} 00000 n \n" for n in range(1, n_objects))
+        lines.append(f"trailer\n<< /Size {n_objects} /Root {self.CATALOG} 0 R >>\n"
+                     f"startxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode('latin-1'))
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+
+def render_card_png(job):
+    """
+    Draw one scorecard to a PNG file (process pool worker)
+    
+    Args:
+        job: Tuple of (card, filename)
+    
+    Returns:
+        The filename written
+    """
+    from PIL import Image, ImageDraw
+    
+    card, filename = job
+    rows = card_table(card)
+    s = PNG_SCALE
+    n_columns = len(rows[0]) - 1
+    column_width = (PAGE_WIDTH - 2 * PAGE_MARGIN - LABEL_WIDTH) / n_columns
+    width = int((PAGE_WIDTH - PAGE_MARGIN) * s)
+    height = int((TITLE_HEIGHT + len(rows) * ROW_HEIGHT + PAGE_MARGIN / 2) * s)
+    image = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(image)
+    
+    left = PAGE_MARGIN / 2 * s
+    draw.text((left, 10 * s), card_title(card), fill='black')
+    grid_top = TITLE_HEIGHT * s
+    grid_right = left + (LABEL_WIDTH + n_columns * column_width) * s
+    grid_bottom = grid_top + len(rows) * ROW_HEIGHT * s
+    for r in range(len(rows) + 1):
+        y = grid_top + r * ROW_HEIGHT * s
+        draw.line([(left, y), (grid_right, y)], fill='black')
+    draw.line([(left, grid_top), (left, grid_bottom)], fill='black')
+    for c in range(n_columns + 1):
+        x = left + (LABEL_WIDTH + c * column_width) * s
+        draw.line([(x, grid_top), (x, grid_bottom)], fill='black')
+    
+    for r, row in enumerate(rows):
+        y = grid_top + (r + 0.3) * ROW_HEIGHT * s
+        draw.text((left + 4 * s, y), row[0], fill='black')
+        for c, cell in enumerate(row[1:]):
+            x = left + (LABEL_WIDTH + (c + 0.5) * column_width) * s - len(cell) * 3
+            draw.text((x, y), cell, fill='black')
+    image.save(filename)
+    return filename
+
+
+def chunks(iterable, size):
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_all(render, jobs, processes=None):
+    """
+    Render jobs in order, a chunk at a time, on a process pool
+    
+    Args:
+        render: Picklable function applied to each job
+        jobs: Iterable of jobs, consumed lazily
+        processes: Worker processes; 1 renders in this process
+    
+    Yields:
+        Rendered results in job order
+    """
+    if processes == 1:
+        for job in jobs:
+            yield render(job)
+        return
+    with Pool(processes) as pool:
+        for chunk in chunks(jobs, RENDER_CHUNK):
+            yield from pool.imap(render, chunk)
+
+
+def export_csv(cards, filename):
+    """
+    Write scorecards to a CSV file, one row per hole
+    
+    Args:
+        cards: Iterable of scorecard dictionaries
+        filename: Output file
+    
+    Returns:
+        Number of cards written
+    """
+    count = 0
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for card in cards:
+            info = {k: card[k] for k in CSV_FIELDS if k in card}
+            for hole in card['holes']:
+                writer.writerow(dict(info, **hole))
+            count += 1
+    return count
+
+
+def export_pdf(cards, filename, processes=None):
+    """
+    Write scorecards to a multi-page PDF, CARDS_PER_PAGE to a page
+    
+    Args:
+        cards: Iterable of scorecard dictionaries
+        filename: Output file
+        processes: Rendering processes, defaults to one per CPU
+    
+    Returns:
+        Number of pages written
+    """
+    with PdfWriter(filename) as pdf:
+        for content in render_all(render_page_pdf, chunks(cards, CARDS_PER_PAGE), processes):
+            pdf.add_page(content)
+        return len(pdf.page_objects)
+
+
+def export_png(cards, directory, processes=None):
+    """
+    Write one PNG per scorecard (requires Pillow)
+    
+    Args:
+        cards: Iterable of scorecard dictionaries
+        directory: Output directory, created if needed
+        processes: Rendering processes, defaults to one per CPU
+    
+    Returns:
+        Number of cards written
+    """
+    if importlib.util.find_spec("PIL") is None:
+        raise ImportError("Pillow is required for PNG export")
+    os.makedirs(directory, exist_ok=True)
+    jobs = ((card, os.path.join(directory, f"card_{card['card']:04d}.png")) for card in cards)
+    return sum(1 for _ in render_all(render_card_png, jobs, processes))
+
+
+def main():
+    """
+    Command line entry point:
+    scorecard_export.py COURSE INDEX N_CARDS OUTPUT [SEED]
+    
+    OUTPUT ending in .csv or .pdf picks the format; anything else is a
+    directory of PNG cards.
+    """
+    if len(sys.argv) < 5:
+        print("Usage: python scorecard_export.py COURSE INDEX N_CARDS OUTPUT [SEED]")
+        return 1
+    course_name, index, n_cards, output = sys.argv[1], float(sys.argv[2]), int(sys.argv[3]), sys.argv[4]
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    
+    course_manager = CourseManager()
+    course_data = course_manager.get_course(course_name)
+    if not course_data:
+        print(f"Course not found: {course_name}")
+        return 1
+    generator = BatchGenerator.from_course(course_data, course_manager.get_hole_model(course_name))
+    cards = iter_cards(generator.generate(index, n_cards, seed), course_name, course_data, index)
+    
+    if output.endswith('.csv'):
+        print(f"Wrote {export_csv(cards, output)} cards to {output}")
+    elif output.endswith('.pdf'):
+        print(f"Wrote {export_pdf(cards, output)} pages to {output}")
+    else:
+        print(f"Wrote {export_png(cards, output)} cards to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Scoring - Handicap posting adjustments and points for batches of rounds
+"""
+import numpy as np
+
+
+# Equitable Stroke Control maximums by course handicap (pre-WHS rules).
+# Course handicaps of 9 or less are limited to double bogey.
+ESC_DOUBLE_BOGEY_MAX = 9
+ESC_LIMITS = [(19, 7), (29, 8), (39, 9)]
+ESC_MAX = 10
+
+
+def net_double_bogey(par, strokes_received):
+    """
+    Calculate the WHS maximum hole score (net double bogey)
+    
+    Args:
+        par: Par values, shape (18,)
+        strokes_received: Strokes received, shape (18,) or (n, 18)
+    
+    Returns:
+        Maximum score allowed on each hole
+    """
+    return np.asarray(par) + 2 + np.asarray(strokes_received)
+
+
+def adjusted_gross_scores(gross, par, strokes_received):
+    """
+    Apply net double bogey to hole scores for handicap posting
+    
+    Args:
+        gross: Gross hole scores, shape (n, 18)
+        par: Par values, shape (18,)
+        strokes_received: Strokes received, shape (n, 18)
+    
+    Returns:
+        Adjusted hole scores, shape (n, 18)
+    """
+    return np.minimum(gross, net_double_bogey(par, strokes_received))
+
+
+def esc_limits(course_handicap, par):
+    """
+    Look up the Equitable Stroke Control maximum for each hole
+    
+    Args:
+        course_handicap: Course handicaps, shape (n,)
+        par: Par values, shape (18,)
+    
+    Returns:
+        Maximum hole scores, shape (n, 18)
+    """
+    course_handicap = np.asarray(course_handicap)[:, np.newaxis]
+    limits = np.full(course_handicap.shape, ESC_MAX, dtype=np.int16)
+    for max_handicap, limit in reversed(ESC_LIMITS):
+        limits[course_handicap <= max_handicap] = limit
+    return np.where(course_handicap <= ESC_DOUBLE_BOGEY_MAX,
+                    np.asarray(par) + 2, limits)
+
+
+def esc_adjusted_scores(gross, par, course_handicap):
+    """
+    Apply Equitable Stroke Control to hole scores
+    
+    Args:
+        gross: Gross hole scores, shape (n, 18)
+        par: Par values, shape (18,)
+        course_handicap: Course handicaps, shape (n,)
+    
+    Returns:
+        Adjusted hole scores, shape (n, 18)
+    """
+    return np.minimum(gross, esc_limits(course_handicap, par))
+
+
+def stableford_points(gross, par, strokes_received=0):
+    """
+    Calculate Stableford points for each hole
+    
+    Net double bogey or worse scores 0, bogey 1, par 2, birdie 3 and so on.
+    Pass strokes_received=0 for gross Stableford. Padded holes of a ragged
+    batch (par 0) score no points.
+    
+    Args:
+        gross: Gross hole scores, shape (n, n_holes)
+        par: Par values, shape (n_holes,) or (n, n_holes)
+        strokes_received: Strokes received, shape (n, n_holes)
+    
+    Returns:
+        Points per hole, shape (n, n_holes)
+    """
+    par = np.asarray(par)
+    points = par + 2 - (gross - strokes_received)
+    return np.where(par > 0, np.maximum(points, 0), 0)
+
+
+def score_differentials(adjusted_gross, course_rating, slope_rating, pcc=0):
+    """
+    Calculate score differentials
+    
+    Args:
+        adjusted_gross: Adjusted gross totals, shape (n,)
+        course_rating: Course rating, scalar or shape (n,)
+        slope_rating: Slope rating, scalar or shape (n,)
+        pcc: Playing conditions calculation adjustment
+    
+    Returns:
+        Differentials rounded to the nearest tenth
+    """
+    differentials = (adjusted_gross - course_rating - pcc) * 113.0 / slope_rating
+    return np.round(differentials, 1)
+
+
+def adjusted_differentials(batch, course_rating, slope_rating, pcc=0):
+    """
+    Calculate posting differentials for a RoundBatch
+    
+    Args:
+        batch: RoundBatch from BatchGenerator.generate
+        course_rating: Course rating from the tees
+        slope_rating: Course slope rating
+        pcc: Playing conditions calculation adjustment
+    
+    Returns:
+        Differentials for each round, shape (n,)
+    """
+    adjusted = adjusted_gross_scores(batch.gross, batch.par, batch.strokes_received)
+    return score_differentials(adjusted.sum(axis=1), course_rating, slope_rating, pcc)
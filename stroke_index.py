@@ -0,0 +1,91 @@
+"""
+Stroke Index - Hole handicaps allocated from simulated scoring
+"""
+import numpy as np
+
+from rng import CounterRNG
+from shot_simulator import ShotSimulator
+
+
+# Populations compared: scratch golfers and bogey golfers
+LOW_INDEX = 0.0
+HIGH_INDEX = 20.0
+
+# Rounds simulated per population; both use the same draws so the
+# per-hole differences are not swamped by sampling noise
+STROKE_INDEX_ROUNDS = 20000
+STROKE_INDEX_SEED = 0
+
+
+def hole_differentials(course_data, n_rounds=STROKE_INDEX_ROUNDS):
+    """
+    Average strokes a bogey golfer loses to a scratch golfer on each hole
+    
+    Scores come from the shot simulator, which works from par and yardage
+    alone, so the hole handicaps being derived do not feed back into the
+    scores they are derived from.
+    
+    Args:
+        course_data: Course data dictionary; hole_handicaps is ignored
+        n_rounds: Rounds simulated per population
+    
+    Returns:
+        Array of differentials, one per hole
+    """
+    n_holes = len(course_data['par_values'])
+    simulator = ShotSimulator(
+        course_data.get('slope_rating', 113),
+        course_data['par_values'],
+        np.arange(1, n_holes + 1),
+        course_data.get('yardages')
+    )
+    means = []
+    for index in (LOW_INDEX, HIGH_INDEX):
+        batch = simulator.generate(index, n_rounds, CounterRNG(STROKE_INDEX_SEED))
+        means.append(batch.gross.mean(axis=0))
+    return means[1] - means[0]
+
+
+def allocate_stroke_indexes(differentials):
+    """
+    Allocate stroke indexes by difficulty, alternating between nines
+    
+    Stroke index 1 goes to the hole with the largest differential and its
+    nine takes the odd indexes; the other nine takes the even ones, each
+    to its hardest remaining hole. Three nines rotate in the order of
+    their hardest holes, and a single nine is ranked straight through.
+    
+    Args:
+        differentials: Difficulty of each hole, larger is harder
+    
+    Returns:
+        List of stroke indexes 1..n_holes, one per hole
+    """
+    differentials = np.asarray(differentials, dtype=float)
+    n_holes = len(differentials)
+    nines = differentials.reshape(-1, 9)
+    
+    # Hardest first within each nine; ties keep hole order
+    order = np.argsort(-nines, axis=1, kind='stable') + 9 * np.arange(len(nines))[:, np.newaxis]
+    rotation = np.argsort(-nines.max(axis=1), kind='stable')
+    
+    indexes = np.zeros(n_holes, dtype=int)
+    for k in range(n_holes):
+        nine = rotation[k % len(rotation)]
+        indexes[order[nine, k // len(rotation)]] = k + 1
+    return indexes.tolist()
+
+
+def suggest_hole_handicaps(course_data, n_rounds=STROKE_INDEX_ROUNDS):
+    """
+    Suggest hole handicaps for a course
+    
+    Args:
+        course_data: Course data dictionary with par_values and, ideally,
+            yardages
+        n_rounds: Rounds simulated per population
+    
+    Returns:
+        List of hole handicaps, one per hole
+    """
+    return allocate_stroke_indexes(hole_differentials(course_data, n_rounds))
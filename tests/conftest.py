@@ -0,0 +1,22 @@
+"""
+Shared fixtures for the test suite
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def course_data():
+    """An 18-hole course with yardages, in CourseManager form"""
+    return {
+        'par_values': [4, 4, 3, 5, 4, 4, 3, 4, 5, 4, 4, 3, 5, 4, 4, 3, 4, 5],
+        'hole_handicaps': [7, 3, 15, 1, 11, 5, 17, 9, 13, 8, 4, 16, 2, 12, 6, 18, 10, 14],
+        'yardages': [385, 410, 165, 520, 360, 430, 150, 395, 505,
+                     370, 420, 180, 540, 345, 400, 140, 380, 495],
+        'course_rating': 71.4,
+        'slope_rating': 128
+    }
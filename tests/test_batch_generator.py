@@ -0,0 +1,49 @@
+"""
+Tests for batch generation against the one-round-at-a-time ghost
+"""
+import numpy as np
+
+from batch_generator import BatchGenerator
+from ghost_golfer import GhostGolfer
+from hole_model import HoleModel
+from rng import CounterRNG
+
+
+def make_ghost(course_data, handicap_index, seed, golfer_id=0):
+    return GhostGolfer(handicap_index, course_data['course_rating'], course_data['slope_rating'],
+                       course_data['par_values'], course_data['hole_handicaps'],
+                       hole_model=HoleModel.from_course(course_data),
+                       rng=CounterRNG(seed), golfer_id=golfer_id)
+
+
+def test_batch_matches_ghost_rounds(course_data):
+    generator = BatchGenerator.from_course(course_data)
+    for handicap_index in (0.0, 8.4, 17.2, 31.5):
+        ghost = make_ghost(course_data, handicap_index, seed=11, golfer_id=3)
+        batch = generator.generate(handicap_index, 50, CounterRNG(11), golfer_ids=3)
+        for round_id in range(50):
+            assert batch.to_round(round_id) == ghost.generate_round(round_id)
+
+
+def test_round_code_replays_exactly(course_data):
+    ghost = make_ghost(course_data, 12.3, seed=5, golfer_id=9)
+    played = [ghost.generate_round() for _ in range(20)]
+    codes = [ghost.round_code(round_id) for round_id in range(20)]
+    
+    replayer = make_ghost(course_data, 12.3, seed=0)
+    assert [replayer.replay_round(code) for code in codes] == played
+    
+    generator = BatchGenerator.from_course(course_data)
+    replayed = generator.replay(12.3, CounterRNG(5), 9, 7)
+    assert replayed.to_round(0) == played[7]
+
+
+def test_replay_refuses_other_index(course_data):
+    ghost = make_ghost(course_data, 12.3, seed=5)
+    ghost.generate_round()
+    other = make_ghost(course_data, 14.0, seed=5)
+    try:
+        other.replay_round(ghost.round_code())
+    except ValueError:
+        return
+    raise AssertionError("Round code from another index was replayed")
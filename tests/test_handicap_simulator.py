@@ -0,0 +1,31 @@
+"""
+Tests for the WHS season simulator
+"""
+import numpy as np
+
+from handicap_simulator import DifferentialWindow, SeasonSimulator
+
+
+def test_steady_state_index_matches_ability(course_data):
+    abilities = np.array([0.0, 5.0, 10.0, 20.0, 30.0])
+    ability = np.repeat(abilities, 100)
+    season = SeasonSimulator([course_data]).run(ability, 120, seed=3)
+    settled = season['index'][40:].mean(axis=0)
+    for level in abilities:
+        assert abs(settled[ability == level].mean() - level) < 0.5
+
+
+
+def test_window_matches_sorted_differentials():
+    rng = np.random.default_rng(0)
+    n_golfers, n_rounds = 50, 60
+    differentials = np.round(rng.normal(12.0, 4.0, (n_rounds, n_golfers)), 1)
+    window = DifferentialWindow(n_golfers)
+    for r in range(n_rounds):
+        window.push(differentials[r])
+        recent = differentials[max(0, r - 19):r + 1]
+        assert np.array_equal(window.sorted[:, :len(recent)], np.sort(recent, axis=0).T)
+        if r >= 19:
+            best = np.ascontiguousarray(np.sort(recent.T, axis=1)[:, :8])
+            expected = np.round(best.mean(axis=1), 1)
+            assert np.allclose(window.handicap_index(), np.minimum(expected, 54.0))
@@ -0,0 +1,36 @@
+"""
+Tests for packed score storage
+"""
+import numpy as np
+import pytest
+
+from batch_generator import BatchGenerator
+from round_codec import MAX_RELATIVE, MIN_RELATIVE, decode_batch, decode_scores, encode_scores
+
+
+@pytest.mark.parametrize('n_holes', [9, 18, 27, 5])
+def test_scores_round_trip(n_holes):
+    rng = np.random.default_rng(n_holes)
+    par = rng.integers(3, 6, n_holes)
+    gross = par + rng.integers(MIN_RELATIVE, MAX_RELATIVE + 1, (2000, n_holes))
+    packed = encode_scores(gross, par)
+    assert packed.shape == (2000, (n_holes + 1) // 2)
+    assert np.array_equal(decode_scores(packed, par, chunk=300), gross)
+
+
+def test_batch_round_trip(course_data):
+    batch = BatchGenerator.from_course(course_data).generate(
+        np.linspace(0, 40, 500), 500, seed=2)
+    decoded = decode_batch(encode_scores(batch.gross, course_data['par_values']),
+                           course_data['par_values'], course_data['hole_handicaps'],
+                           batch.course_handicap)
+    assert np.array_equal(decoded.gross, batch.gross)
+    assert np.array_equal(decoded.net, batch.net)
+
+
+@pytest.mark.parametrize('offset', [MIN_RELATIVE - 1, MAX_RELATIVE + 1])
+def test_out_of_range_scores_are_rejected(offset):
+    par = np.array([4, 3, 5])
+    gross = np.array([par, par + np.array([0, offset, 0])])
+    with pytest.raises(ValueError, match="hole 2 of round 1"):
+        encode_scores(gross, par)
@@ -0,0 +1,51 @@
+"""
+Tests for archive aggregates against a brute-force recomputation
+"""
+import numpy as np
+
+from batch_generator import BatchGenerator
+from course_manager import CourseManager
+from round_query import RoundQueryEngine
+
+
+def test_aggregates_match_brute_force(tmp_path, course_data):
+    course_manager = CourseManager(str(tmp_path / "courses.json"))
+    course_manager.add_course("Test Links", course_data)
+    generator = BatchGenerator.from_course(course_data)
+    engine = RoundQueryEngine(str(tmp_path / "archive"), course_manager)
+    
+    rng = np.random.default_rng(8)
+    indexes, gross, net = [], [], []
+    for seed in range(4):
+        index = np.round(rng.uniform(0, 30, 1500), 1)
+        batch = generator.generate(index, 1500, seed=seed)
+        engine.append("Test Links", batch, index, seed=seed)
+        indexes.append(index)
+        gross.append(batch.gross)
+        net.append(batch.net)
+    indexes, scores = np.concatenate(indexes), {'gross': np.concatenate(gross),
+                                                'net': np.concatenate(net)}
+    
+    # A fresh engine reloads the saved aggregates rather than rescanning
+    engine = RoundQueryEngine(str(tmp_path / "archive"), course_manager)
+    for metric in ('gross', 'net'):
+        for low, high in ((0, 30), (10.0, 15.0), (4.2, 4.2)):
+            rows = (indexes >= low) & (indexes <= high)
+            totals = scores[metric][rows].sum(axis=1)
+            stats = engine.round_stats("Test Links", metric, (low, high))
+            assert stats['count'] == rows.sum()
+            if rows.any():
+                assert np.isclose(stats['mean'], totals.mean())
+                assert np.isclose(stats['std'], totals.std())
+                assert np.allclose(stats['hole_means'], scores[metric][rows].mean(axis=0))
+            
+            hole = engine.hole_stats("Test Links", 4, metric, (low, high))
+            values = scores[metric][rows, 3]
+            assert hole['count'] == rows.sum()
+            assert hole['histogram'] == np.bincount(values, minlength=20).tolist()
+    
+    handicaps = np.round(indexes * course_data['slope_rating'] / 113)
+    rows = np.isin(handicaps, [12, 13])
+    stats = engine.round_stats("Test Links", 'net', course_handicaps=[12, 13])
+    assert stats['count'] == rows.sum()
+    assert np.isclose(stats['mean'], scores['net'][rows].sum(axis=1).mean())
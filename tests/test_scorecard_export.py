@@ -0,0 +1,14 @@
+"""
+Tests for scorecard export
+"""
+from batch_generator import BatchGenerator
+from scorecard_export import export_pdf, iter_cards
+
+
+def test_pdf_is_identical_with_and_without_pool(tmp_path, course_data):
+    batch = BatchGenerator.from_course(course_data).generate(14.2, 45, seed=6)
+    single, pooled = tmp_path / "single.pdf", tmp_path / "pooled.pdf"
+    pages = export_pdf(iter_cards(batch, "Test Links", course_data, 14.2), str(single), processes=1)
+    assert export_pdf(iter_cards(batch, "Test Links", course_data, 14.2), str(pooled),
+                      processes=2) == pages
+    assert single.read_bytes() == pooled.read_bytes()
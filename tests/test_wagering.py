@@ -0,0 +1,48 @@
+"""
+Tests for Nassau presses and skins against brute-force settlement
+"""
+import numpy as np
+import pytest
+
+from wagering import hole_results, pressed_bet, skins
+
+
+def settle_by_hand(results, press_at):
+    """Follow the bets hole by hole, pressing the latest bet when it is press_at down"""
+    starts = [0]
+    for hole in range(len(results) - 1):
+        if press_at and abs(results[starts[-1]:hole + 1].sum()) >= press_at:
+            starts.append(hole + 1)
+    return sum(int(np.sign(results[start:].sum())) for start in starts), len(starts) - 1
+
+
+@pytest.mark.parametrize('press_at', [0, 1, 2, 3])
+@pytest.mark.parametrize('n_holes', [9, 18])
+def test_pressed_bet_matches_brute_force(press_at, n_holes):
+    rng = np.random.default_rng(press_at * 100 + n_holes)
+    results = hole_results(rng.integers(3, 7, (3000, n_holes)), rng.integers(3, 7, (3000, n_holes)))
+    units, presses = pressed_bet(results, press_at)
+    expected = np.array([settle_by_hand(row, press_at) for row in results])
+    assert np.array_equal(units, expected[:, 0])
+    assert np.array_equal(presses, expected[:, 1])
+
+
+def test_skins_are_zero_sum_and_match_brute_force():
+    rng = np.random.default_rng(4)
+    net = rng.integers(3, 7, (2000, 4, 18))
+    settled = skins(net, stake=2.0)
+    assert np.allclose(settled['winnings'].sum(axis=1), 0.0)
+    
+    for match in range(200):
+        won = np.zeros(4)
+        carried = 0
+        for hole in range(18):
+            carried += 1
+            low = net[match, :, hole].min()
+            at_low = np.flatnonzero(net[match, :, hole] == low)
+            if len(at_low) == 1:
+                won[at_low[0]] += carried
+                carried = 0
+        assert np.array_equal(settled['skins'][match], won)
+        assert settled['carried'][match] == carried
+        assert np.allclose(settled['winnings'][match], 2.0 * (4 * won - won.sum()))
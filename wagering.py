@@ -0,0 +1,161 @@
+"""
+Wagering - Settle Nassau and skins games over batches of simulated matches
+"""
+import numpy as np
+
+
+# A bet that goes this many holes down is pressed automatically
+PRESS_AT = 2
+
+
+def hole_results(net_a, net_b):
+    """
+    Match play result of every hole
+    
+    Args:
+        net_a: Net hole scores of side A, shape (n, n_holes)
+        net_b: Net hole scores of side B, same shape
+    
+    Returns:
+        Int8 array of +1 where A wins the hole, -1 where B wins it and 0
+        where it is halved
+    """
+    return np.sign(np.asarray(net_b, dtype=np.int16)
+                   - np.asarray(net_a, dtype=np.int16)).astype(np.int8)
+
+
+def pressed_bet(results, press_at=PRESS_AT):
+    """
+    Settle one match play bet and its automatic presses
+    
+    Whenever the most recent bet goes press_at holes down for either side,
+    a new bet starts on the next hole and runs to the end of the segment.
+    Bets are found by following this chain from the first hole; each link
+    is a vectorized search over the remaining holes, and a chain has at
+    most n_holes / press_at links.
+    
+    Args:
+        results: Hole results from A's side, shape (n, n_holes)
+        press_at: Holes down that trigger a press; 0 disables presses
+    
+    Returns:
+        Tuple of (units won by A over all bets, number of presses), both of
+        shape (n,)
+    """
+    n, n_holes = results.shape
+    standing = np.zeros((n, n_holes + 1), dtype=np.int16)
+    np.cumsum(results, axis=1, out=standing[:, 1:])
+    final = standing[:, -1]
+    
+    # Every match starts with the original bet on the first hole; only
+    # matches whose latest bet can still be pressed are searched again
+    units = np.sign(final).astype(np.int64)
+    presses = np.zeros(n, dtype=np.int64)
+    live = np.arange(n) if press_at else np.zeros(0, dtype=np.int64)
+    start = np.zeros(len(live), dtype=np.int64)
+    holes = np.arange(n_holes)
+    while live.size:
+        # First hole, from the latest bet's start, where it is press_at down
+        played = standing[live]
+        margin = played[:, 1:] - played[np.arange(len(live)), start][:, np.newaxis]
+        trigger = (holes >= start[:, np.newaxis]) & (np.abs(margin) >= press_at)
+        start = np.argmax(trigger, axis=1) + 1
+        pressed = trigger.any(axis=1) & (start < n_holes)
+        
+        live, start = live[pressed], start[pressed]
+        units[live] += np.sign(final[live] - standing[live, start])
+        presses[live] += 1
+    return units, presses
+
+
+def nassau(net_a, net_b, stake=1.0, press_at=PRESS_AT):
+    """
+    Settle Nassau bets on the front, back and overall
+    
+    The front and back are the two halves of the round. Each of the three
+    bets is match play for the stake, with automatic presses.
+    
+    Args:
+        net_a: Net hole scores of side A, shape (n, n_holes)
+        net_b: Net hole scores of side B, same shape
+        stake: Amount of each bet and each press
+        press_at: Holes down that trigger a press; 0 disables presses
+    
+    Returns:
+        Dictionary of A's winnings per match, shape (n,), for 'front',
+        'back', 'overall' and 'total', and the number of 'presses'
+    """
+    results = hole_results(net_a, net_b)
+    turn = results.shape[1] // 2
+    settled = {}
+    presses = 0
+    for bet, holes in (('front', slice(0, turn)), ('back', slice(turn, None)),
+                       ('overall', slice(None))):
+        units, pressed = pressed_bet(results[:, holes], press_at)
+        settled[bet] = units * stake
+        presses = presses + pressed
+    settled['total'] = settled['front'] + settled['back'] + settled['overall']
+    settled['presses'] = presses
+    return settled
+
+
+def skins(net_scores, stake=1.0):
+    """
+    Settle a skins game with carryovers
+    
+    A hole is won by the only player with the lowest net score; when the
+    low score is tied the skin carries over and the next hole won takes
+    every skin carried to it. Each skin is worth the stake from every
+    other player. Skins still carried after the last hole are not paid.
+    
+    Args:
+        net_scores: Net hole scores, shape (n, n_players, n_holes)
+        stake: Amount each other player pays per skin
+    
+    Returns:
+        Dictionary with 'winnings' and 'skins' won per player, shape
+        (n, n_players), and 'carried', the skins left unpaid, shape (n,)
+    """
+    net_scores = np.asarray(net_scores)
+    n, n_players, n_holes = net_scores.shape
+    low = net_scores.min(axis=1, keepdims=True)
+    at_low = net_scores == low
+    won = at_low.sum(axis=1) == 1
+    
+    # Skins on a hole: one plus the holes carried since the last hole won
+    holes = np.arange(n_holes)
+    last_won = np.maximum.accumulate(np.where(won, holes, -1), axis=1)
+    previous_won = np.concatenate([np.full((n, 1), -1), last_won[:, :-1]], axis=1)
+    value = np.where(won, holes - previous_won, 0)
+    
+    skins_won = np.einsum('nph,nh->np', at_low & won[:, np.newaxis], value)
+    paid = value.sum(axis=1)
+    winnings = stake * (n_players * skins_won - paid[:, np.newaxis])
+    return {
+        'winnings': winnings,
+        'skins': skins_won,
+        'carried': n_holes - 1 - last_won[:, -1]
+    }
+
+
+def summarize_winnings(winnings):
+    """
+    Expected value and risk of a side's winnings over simulated matches
+    
+    Args:
+        winnings: Winnings per match, shape (n,)
+    
+    Returns:
+        Dictionary with the 'mean', its 'standard_error', the 'std' and
+        the shares of matches won, lost and pushed
+    """
+    winnings = np.asarray(winnings, dtype=float)
+    std = float(winnings.std())
+    return {
+        'mean': float(winnings.mean()),
+        'standard_error': std / float(np.sqrt(max(len(winnings), 1))),
+        'std': std,
+        'won': float(np.mean(winnings > 0)),
+        'lost': float(np.mean(winnings < 0)),
+        'pushed': float(np.mean(winnings == 0))
+    }